@@ -2,18 +2,31 @@ from flask import Flask
 from flask_cors import CORS
 from app.config import Config
 from app.extensions import mongo, jwt, scheduler
+from app.services.read_router import read_metrics, read_router
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
     # Initialize extensions
-    mongo.init_app(app)
+    mongo.init_app(app, event_listeners=[read_metrics])
     jwt.init_app(app)
     CORS(app)
+    read_router.init_app(app)
+
+    from app.services.log_buffer import log_buffer
+    log_buffer.init_app(app)
+    from app.services.event_bus import event_bus
+    event_bus.init_app(app)
     
-    # Initialize scheduler
-    if not scheduler.running:
+    # Initialize scheduler and background jobs (opt-in, see SCHEDULER_ENABLED)
+    if app.config['SCHEDULER_ENABLED']:
+        from app.services.retention_service import RetentionService
+        from app.services.reset_service import ResetService
+        from app.services.leaderboard_service import LeaderboardService
+        RetentionService.schedule(app)
+        ResetService.schedule(app)
+        LeaderboardService.schedule(app)
         scheduler.start()
 
     # Register Blueprints
@@ -23,6 +36,11 @@ def create_app(config_class=Config):
     from app.routes.stats import stats_bp
     from app.routes.notifications import notifications_bp
     from app.routes.daily_tasks import daily_tasks_bp
+    from app.routes.jobs import jobs_bp
+    from app.routes.stream import stream_bp
+    from app.routes.metrics import metrics_bp
+    from app.routes.sync import sync_bp
+    from app.routes.leaderboard import leaderboard_bp
 
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(timetable_bp, url_prefix='/api/timetable')
@@ -30,6 +48,11 @@ def create_app(config_class=Config):
     app.register_blueprint(stats_bp, url_prefix='/api/stats')
     app.register_blueprint(notifications_bp, url_prefix='/api/notifications')
     app.register_blueprint(daily_tasks_bp, url_prefix='/api/daily-tasks')
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    app.register_blueprint(stream_bp, url_prefix='/api/stream')
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')
+    app.register_blueprint(sync_bp, url_prefix='/api/sync')
+    app.register_blueprint(leaderboard_bp, url_prefix='/api/leaderboard')
 
     @app.route('/')
     def index():
@@ -8,6 +8,91 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     SCHEDULER_API_ENABLED = True
+    # Recurring background jobs (log retention, running reset jobs,
+    # leaderboard refreshes) only run in processes that opt in. Enable it for
+    # run_scheduler.py alone, never for the multi-worker web server
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() == 'true'
+
+    # Log retention: raw logs older than this are rolled up into monthly
+    # summaries and archived to LOG_ARCHIVE_DIR as gzipped NDJSON
+    LOG_RETENTION_DAYS = int(os.environ.get('LOG_RETENTION_DAYS', 180))
+    LOG_ARCHIVE_DIR = os.environ.get('LOG_ARCHIVE_DIR', os.path.join(os.getcwd(), 'archive'))
+    # Only the holder of this lease runs compaction; it is renewed after each
+    # student-month, so it only lapses if the holder stops making progress
+    LOG_COMPACTION_LEASE_SECONDS = int(os.environ.get('LOG_COMPACTION_LEASE_SECONDS', 600))
+
+    # Background reset jobs are queued in `jobs` and picked up by the
+    # scheduler process every RESET_POLL_SECONDS. They delete in batches of
+    # RESET_BATCH_SIZE documents, pausing RESET_BATCH_DELAY seconds between
+    # batches. Jobs that made no progress for RESET_JOB_STALE_SECONDS are
+    # assumed dead and resumed.
+    RESET_BATCH_SIZE = int(os.environ.get('RESET_BATCH_SIZE', 500))
+    RESET_BATCH_DELAY = float(os.environ.get('RESET_BATCH_DELAY', 0.05))
+    RESET_JOB_STALE_SECONDS = int(os.environ.get('RESET_JOB_STALE_SECONDS', 300))
+    RESET_POLL_SECONDS = int(os.environ.get('RESET_POLL_SECONDS', 2))
+
+    # Log ingestion: 'direct' writes each entry through DailyLog.create,
+    # 'buffered' coalesces entries per (student, subject, date) in memory and
+    # flushes them as bulk writes every LOG_BUFFER_WINDOW_MS.
+    # LOG_BUFFER_DURABILITY: 'accepted' acks once buffered, 'flushed' acks
+    # after the bulk write is acknowledged with LOG_BUFFER_WRITE_CONCERN.
+    # 'flushed' holds each request for up to one window, which only scales
+    # on async (gevent) workers; a request answered 503 left no write behind.
+    LOG_INGEST_MODE = os.environ.get('LOG_INGEST_MODE', 'direct')
+    LOG_BUFFER_WINDOW_MS = int(os.environ.get('LOG_BUFFER_WINDOW_MS', 200))
+    LOG_BUFFER_MAX_KEYS = int(os.environ.get('LOG_BUFFER_MAX_KEYS', 10000))
+    LOG_BUFFER_DURABILITY = os.environ.get('LOG_BUFFER_DURABILITY', 'flushed')
+    LOG_BUFFER_WRITE_CONCERN = os.environ.get('LOG_BUFFER_WRITE_CONCERN', '1')
+
+    # Live updates (/api/stream): 'auto' follows a MongoDB change stream when
+    # the deployment is a replica set and otherwise passes events between
+    # worker processes through a capped collection of STREAM_EVENTS_SIZE_BYTES;
+    # 'change_stream' and 'capped' force one or the other, 'local' keeps
+    # events in-process (single-process servers only)
+    STREAM_SOURCE = os.environ.get('STREAM_SOURCE', 'auto')
+    STREAM_HEARTBEAT_SECONDS = int(os.environ.get('STREAM_HEARTBEAT_SECONDS', 15))
+    STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 16))
+    STREAM_MAX_SUBSCRIBERS = int(os.environ.get('STREAM_MAX_SUBSCRIBERS', 5000))
+    STREAM_EVENTS_SIZE_BYTES = int(os.environ.get('STREAM_EVENTS_SIZE_BYTES', 16 * 1024 * 1024))
+
+    # Read preference per operation. Secondary reads are bounded by
+    # READ_MAX_STALENESS_SECONDS (MongoDB requires at least 90); reads right
+    # after a client's write for a student use a causally consistent session,
+    # fed from a cookie that names up to READ_YOUR_WRITES_MAX_STUDENTS students.
+    READ_ROUTES = {
+        'stats': os.environ.get('READ_PREFERENCE_STATS', 'secondaryPreferred'),
+        'timetable': os.environ.get('READ_PREFERENCE_TIMETABLE', 'secondaryPreferred'),
+        'daily_tasks': os.environ.get('READ_PREFERENCE_DAILY_TASKS', 'primary'),
+        'me': os.environ.get('READ_PREFERENCE_ME', 'primary')
+    }
+    READ_MAX_STALENESS_SECONDS = int(os.environ.get('READ_MAX_STALENESS_SECONDS', 90))
+    READ_YOUR_WRITES_MAX_STUDENTS = int(os.environ.get('READ_YOUR_WRITES_MAX_STUDENTS', 50))
+
+    # Delta sync (/api/sync): cursors trail the server clock by
+    # SYNC_CLOCK_SKEW_SECONDS so writes racing a sync are sent again next time.
+    # Tombstones expire after SYNC_TOMBSTONE_TTL_DAYS; older cursors get a full sync.
+    SYNC_CLOCK_SKEW_SECONDS = int(os.environ.get('SYNC_CLOCK_SKEW_SECONDS', 5))
+    SYNC_TOMBSTONE_TTL_DAYS = int(os.environ.get('SYNC_TOMBSTONE_TTL_DAYS', 30))
+
+    # Per-student timetable version index used for planned hours, revalidated
+    # against the student's plan version on every read
+    PLAN_CACHE_SIZE = int(os.environ.get('PLAN_CACHE_SIZE', 10000))
+
+    # Weekly leaderboard (/api/leaderboard): the top LEADERBOARD_TOP_K students
+    # are stored per week, computed only by the scheduler process. A board
+    # older than LEADERBOARD_REFRESH_SECONDS is recomputed once new logs
+    # arrive, and after LEADERBOARD_MAX_AGE_SECONDS regardless, so timetable
+    # edits show up in adherence. Boards go back LEADERBOARD_HISTORY_WEEKS;
+    # weeks without one answer 202 and are computed within
+    # LEADERBOARD_REQUEST_POLL_SECONDS, with at most LEADERBOARD_MAX_REQUESTS
+    # weeks queued at a time.
+    LEADERBOARD_TOP_K = int(os.environ.get('LEADERBOARD_TOP_K', 100))
+    LEADERBOARD_REFRESH_SECONDS = int(os.environ.get('LEADERBOARD_REFRESH_SECONDS', 300))
+    LEADERBOARD_MAX_AGE_SECONDS = int(os.environ.get('LEADERBOARD_MAX_AGE_SECONDS', 3600))
+    LEADERBOARD_HISTORY_WEEKS = int(os.environ.get('LEADERBOARD_HISTORY_WEEKS', 52))
+    LEADERBOARD_REQUEST_POLL_SECONDS = int(os.environ.get('LEADERBOARD_REQUEST_POLL_SECONDS', 10))
+    LEADERBOARD_MAX_REQUESTS = int(os.environ.get('LEADERBOARD_MAX_REQUESTS', 20))
+    LEADERBOARD_LEASE_SECONDS = int(os.environ.get('LEADERBOARD_LEASE_SECONDS', 600))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -1,7 +1,37 @@
+import threading
+
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager
-from apscheduler.schedulers.background import BackgroundScheduler
+
+class LazyScheduler:
+    """APScheduler BackgroundScheduler that is only imported and created on
+    first use, so processes that never schedule anything don't pay for it."""
+
+    def __init__(self):
+        self._scheduler = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._scheduler is None:
+            with self._lock:
+                if self._scheduler is None:
+                    from apscheduler.schedulers.background import BackgroundScheduler
+                    self._scheduler = BackgroundScheduler()
+        return self._scheduler
+
+    @property
+    def running(self):
+        return self._scheduler is not None and self._scheduler.running
+
+    def start(self):
+        scheduler = self._get()
+        with self._lock:
+            if not scheduler.running:
+                scheduler.start()
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
 
 mongo = PyMongo()
 jwt = JWTManager()
-scheduler = BackgroundScheduler()
+scheduler = LazyScheduler()
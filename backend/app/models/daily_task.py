@@ -1,29 +1,34 @@
 from app.extensions import mongo
+from app.models.records import TaskRecord
+from app.models.tombstone import Tombstone
+from app.services.event_bus import event_bus
+from app.services.read_router import read_router
 from datetime import datetime
 from bson.objectid import ObjectId
 
 class DailyTask:
     @staticmethod
     def create(student_id, title, date_str):
+        now = datetime.utcnow()
         task = {
             "studentId": student_id,
             "title": title,
             "date": date_str, # YYYY-MM-DD
             "isCompleted": False,
-            "createdAt": datetime.utcnow()
+            "createdAt": now,
+            "updatedAt": now
         }
         result = mongo.db.daily_tasks.insert_one(task)
+        event_bus.notify('daily_tasks', 'insert', task)
         return str(result.inserted_id)
 
     @staticmethod
     def get_by_date(student_id, date_str):
-        tasks = list(mongo.db.daily_tasks.find({
+        cursor = read_router.db('daily_tasks').daily_tasks.find({
             "studentId": student_id,
             "date": date_str
-        }))
-        for task in tasks:
-            task['_id'] = str(task['_id'])
-        return tasks
+        }, TaskRecord.PROJECTION)
+        return [TaskRecord(task) for task in cursor]
 
     @staticmethod
     def toggle_completion(task_id, student_id):
@@ -34,11 +39,15 @@ class DailyTask:
         new_status = not task.get('isCompleted', False)
         mongo.db.daily_tasks.update_one(
             {"_id": ObjectId(task_id)},
-            {"$set": {"isCompleted": new_status}}
+            {"$set": {"isCompleted": new_status, "updatedAt": datetime.utcnow()}}
         )
+        event_bus.notify('daily_tasks', 'update', dict(task, isCompleted=new_status))
         return new_status
 
     @staticmethod
     def delete(task_id, student_id):
         result = mongo.db.daily_tasks.delete_one({"_id": ObjectId(task_id), "studentId": student_id})
+        if result.deleted_count:
+            Tombstone.record_delete(student_id, 'tasks', task_id)
+            event_bus.publish(student_id, {"type": "task", "op": "delete", "data": {"_id": task_id}})
         return result.deleted_count > 0
@@ -0,0 +1,74 @@
+from app.extensions import mongo
+from datetime import datetime
+from bson.objectid import ObjectId
+
+class Job:
+    @staticmethod
+    def create(kind, student_id):
+        now = datetime.utcnow()
+        job = {
+            "kind": kind, # 'logs' or 'timetable'
+            "studentId": student_id,
+            "status": "pending", # pending -> running -> completed / failed
+            "deleted": 0,
+            "lastId": None, # resume cursor: last _id already deleted
+            "error": None,
+            "claimedAt": None, # set once a scheduler process takes it
+            "createdAt": now,
+            "updatedAt": now
+        }
+        result = mongo.db.jobs.insert_one(job)
+        return str(result.inserted_id)
+
+    @staticmethod
+    def find(job_id):
+        return mongo.db.jobs.find_one({"_id": ObjectId(job_id)})
+
+    @staticmethod
+    def get(job_id):
+        job = mongo.db.jobs.find_one({"_id": ObjectId(job_id)})
+        if not job:
+            return None
+        job['_id'] = str(job['_id'])
+        if job.get('lastId'):
+            job['lastId'] = str(job['lastId'])
+        return job
+
+    @staticmethod
+    def record_progress(job_id, last_id, deleted):
+        mongo.db.jobs.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$set": {"status": "running", "lastId": last_id, "updatedAt": datetime.utcnow()},
+                "$inc": {"deleted": deleted}
+            }
+        )
+
+    @staticmethod
+    def mark_completed(job_id):
+        mongo.db.jobs.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"status": "completed", "updatedAt": datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def mark_failed(job_id, error):
+        mongo.db.jobs.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {"status": "failed", "error": error, "updatedAt": datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def claim(stale_before):
+        # Atomically take one queued job, or one unfinished job that stopped
+        # making progress, so only one process runs it. Returns the job as
+        # it was before the claim.
+        now = datetime.utcnow()
+        return mongo.db.jobs.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "claimedAt": None},
+                {"status": {"$in": ["pending", "running"]}, "updatedAt": {"$lt": stale_before}}
+            ]},
+            {"$set": {"claimedAt": now, "updatedAt": now}},
+            sort=[("createdAt", 1)]
+        )
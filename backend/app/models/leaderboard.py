@@ -0,0 +1,36 @@
+from app.extensions import mongo
+from datetime import datetime
+
+class Leaderboard:
+    """Materialized weekly ranking, one document per week: the top students
+    by hours and by plan adherence plus percentile cutoffs for both, so a
+    read costs O(k) whatever the number of students."""
+
+    @staticmethod
+    def save(week, board):
+        mongo.db.leaderboards.replace_one({"week": week}, dict(board, week=week), upsert=True)
+        mongo.db.leaderboard_requests.delete_one({"_id": week})
+
+    @staticmethod
+    def get(week):
+        return mongo.db.leaderboards.find_one({"week": week}, {"_id": 0})
+
+    @staticmethod
+    def request(week, limit):
+        """Queue a week without a board for the scheduler to compute.
+        False when `limit` other weeks are already queued."""
+        requests = mongo.db.leaderboard_requests
+        if requests.find_one({"_id": week}, {"_id": 1}):
+            return True
+        if requests.count_documents({}) >= limit:
+            return False
+        requests.update_one({"_id": week}, {"$setOnInsert": {"requestedAt": datetime.utcnow()}}, upsert=True)
+        return True
+
+    @staticmethod
+    def requested():
+        return [request['_id'] for request in mongo.db.leaderboard_requests.find({}, {"_id": 1}).sort("requestedAt", 1)]
+
+    @staticmethod
+    def cancel(week):
+        mongo.db.leaderboard_requests.delete_one({"_id": week})
@@ -0,0 +1,38 @@
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+
+from pymongo.errors import DuplicateKeyError
+
+from app.extensions import mongo
+
+class Lease:
+    """Named lock with an expiry, held in MongoDB so that one process
+    across all workers and hosts runs a given job. A holder that dies
+    releases it implicitly once `expiresAt` passes."""
+
+    @staticmethod
+    def owner():
+        return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def acquire(name, owner, seconds):
+        """Take the lease, or extend it when `owner` already holds it.
+        Returns False while another owner holds an unexpired lease."""
+        now = datetime.utcnow()
+        try:
+            # When held by someone else the filter misses and the upsert
+            # collides with the existing _id
+            mongo.db.leases.update_one(
+                {"_id": name, "$or": [{"owner": owner}, {"expiresAt": {"$lt": now}}]},
+                {"$set": {"owner": owner, "expiresAt": now + timedelta(seconds=seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return False
+        return True
+
+    @staticmethod
+    def release(name, owner):
+        mongo.db.leases.delete_one({"_id": name, "owner": owner})
@@ -1,50 +1,108 @@
 from app.extensions import mongo
+from app.models.log_summary import LogSummary
+from app.models.records import LogEntry
+from app.models.subject import SubjectCatalog
+from app.models.tombstone import Tombstone
+from app.models.weekly_total import WeeklyTotal
+from app.services.event_bus import event_bus
+from app.services.read_router import read_router
+from app.services.retention_service import RetentionService
 from datetime import datetime
 from bson.objectid import ObjectId
 
 class DailyLog:
     @staticmethod
     def create(student_id, subject_id, date_str, hours_spent, notes):
+        now = datetime.utcnow()
         log = {
             "studentId": student_id,
-            "subjectId": subject_id,
+            "subjectId": SubjectCatalog.get_key(student_id, subject_id),
             "date": date_str, # ISO string YYYY-MM-DD
             "hoursSpent": hours_spent,
             "notes": notes,
-            "createdAt": datetime.utcnow()
+            "createdAt": now,
+            "updatedAt": now
         }
-        result = mongo.db.daily_logs.insert_one(log)
-        
         # Update actual hours in timetable for that day
         # First, find the day of week from the date
         date_obj = datetime.strptime(date_str, "%Y-%m-%d")
         day_of_week = date_obj.weekday() # 0=Monday, 6=Sunday
-        
-        # Increment actual hours
-        mongo.db.timetables.update_one(
-            {
-                "studentId": student_id,
-                "subjectId": subject_id,
-                "dayOfWeek": day_of_week
-            },
-            {
-                "$inc": {"actualHours": hours_spent}
-            }
-        )
+
+        # Session lets the student's next dashboard read see this write,
+        # even when it is served by a secondary
+        with read_router.write_session([student_id]) as session:
+            result = mongo.db.daily_logs.insert_one(log, session=session)
+
+            # Increment actual hours
+            mongo.db.timetables.update_one(
+                {
+                    "studentId": student_id,
+                    "subjectId": SubjectCatalog.match(student_id, subject_id),
+                    "dayOfWeek": day_of_week
+                },
+                {
+                    "$inc": {"actualHours": hours_spent},
+                    "$set": {"updatedAt": now}
+                },
+                session=session
+            )
+            WeeklyTotal.add(student_id, date_str, hours_spent, session=session)
+        event_bus.notify('daily_logs', 'insert', log)
         return str(result.inserted_id)
         
     @staticmethod
-    def delete_all(student_id):
-        print(f"DEBUG: DailyLog.delete_all called for student_id: {student_id}")
-        # 1. Delete all logs
-        result = mongo.db.daily_logs.delete_many({"studentId": student_id})
-        print(f"DEBUG: Deleted {result.deleted_count} logs")
-        
-        # 2. Reset actualHours in timetables to 0
+    def get_by_dates(student_id, dates, session=None, operation='timetable'):
+        cursor = read_router.db(operation).daily_logs.find({
+            "studentId": student_id,
+            "date": {"$in": dates}
+        }, LogEntry.PROJECTION, session=session)
+        return [LogEntry.from_doc(log) for log in cursor]
+
+    @staticmethod
+    def hours_by_student(dates, student_ids=None):
+        """{studentId: hours} over the given dates for every student (or
+        those in `student_ids`), in one grouped aggregation."""
+        match = {"date": {"$in": dates}}
+        if student_ids is not None:
+            match["studentId"] = {"$in": list(student_ids)}
+        groups = mongo.db.daily_logs.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$studentId", "hours": {"$sum": {"$toDouble": "$hoursSpent"}}}}
+        ], allowDiskUse=True)
+        return {group['_id']: group['hours'] for group in groups}
+
+    @staticmethod
+    def delete_batch(student_id, after_id=None, limit=500):
+        # Delete the next `limit` logs by _id range, returning the number
+        # deleted and the last _id covered (None once nothing is left)
+        query = {"studentId": student_id}
+        if after_id:
+            query["_id"] = {"$gt": after_id}
+        ids = [doc['_id'] for doc in mongo.db.daily_logs.find(query, {"_id": 1}).sort("_id", 1).limit(limit)]
+        if not ids:
+            return 0, None
+
+        result = mongo.db.daily_logs.delete_many({
+            "studentId": student_id,
+            "_id": {"$gte": ids[0], "$lte": ids[-1]}
+        })
+        return result.deleted_count, ids[-1]
+
+    @staticmethod
+    def finish_reset(student_id):
+        """Run once every log of the student has been deleted: clears what
+        was derived from them and tells clients."""
+        DailyLog.reset_actual_hours(student_id)
+        WeeklyTotal.clear(student_id)
+        # Compacted months live on as summaries and archive files
+        LogSummary.delete_for_student(student_id)
+        RetentionService.delete_archives(student_id)
+        Tombstone.record_reset(student_id, 'logs')
+        event_bus.publish(student_id, {"type": "reset", "kind": "logs"})
+
+    @staticmethod
+    def reset_actual_hours(student_id):
         mongo.db.timetables.update_many(
             {"studentId": student_id},
-            {"$set": {"actualHours": 0}}
+            {"$set": {"actualHours": 0, "updatedAt": datetime.utcnow()}}
         )
-        print("DEBUG: Reset actualHours in timetables")
-        
-        return result.deleted_count
@@ -0,0 +1,99 @@
+from app.extensions import mongo
+from app.models.records import LogEntry
+from app.services.read_router import read_router
+from datetime import datetime
+from pymongo.errors import DuplicateKeyError
+
+class LogSummary:
+    """Monthly roll-up of archived daily logs, one document per
+    (studentId, subjectId, month). Per-day hours are kept in `days` so
+    weekly and daily stats stay exact after the raw logs are gone."""
+    _indexed = False
+
+    @staticmethod
+    def add_batch(student_id, subject_id, month, batch_id, hours_by_day, log_count):
+        """Fold one archived batch into the summary, at most once. Returns
+        False if the batch was already counted (a re-run after a crash, or
+        another process compacting the same logs)."""
+        LogSummary._ensure_indexes()
+        inc = {
+            "hoursSpent": sum(hours_by_day.values()),
+            "logCount": log_count
+        }
+        for date_str, hours in hours_by_day.items():
+            inc[f"days.{date_str}"] = hours
+
+        # The batch check and the $inc are one atomic update. If the batch
+        # is already in `archives` the filter misses, and the upsert runs
+        # into the unique key instead of creating a second summary.
+        for _ in range(2):
+            try:
+                mongo.db.daily_log_summaries.update_one(
+                    {
+                        "studentId": student_id,
+                        "subjectId": subject_id,
+                        "month": month, # YYYY-MM
+                        "archives": {"$ne": batch_id}
+                    },
+                    {
+                        "$inc": inc,
+                        "$push": {"archives": batch_id},
+                        "$set": {"updatedAt": datetime.utcnow()}
+                    },
+                    upsert=True
+                )
+                return True
+            except DuplicateKeyError:
+                # Either the batch is folded in already, or another batch
+                # created the summary first; the retry tells them apart
+                continue
+        return False
+
+    @staticmethod
+    def get_daily_hours(student_id, dates, session=None):
+        """Return LogEntry rows for the given dates, read from the monthly
+        summaries."""
+        wanted = set(dates)
+        months = sorted({d[:7] for d in wanted})
+        summaries = read_router.db('stats').daily_log_summaries.find(
+            {"studentId": student_id, "month": {"$in": months}},
+            {"subjectId": 1, "days": 1},
+            session=session
+        )
+        rows = []
+        for summary in summaries:
+            for date_str, hours in summary.get('days', {}).items():
+                if date_str in wanted:
+                    rows.append(LogEntry(None, summary['subjectId'], date_str, hours))
+        return rows
+
+    @staticmethod
+    def hours_by_student(dates, student_ids=None):
+        """{studentId: hours} over the given dates for every student (or
+        those in `student_ids`), read from the monthly summaries."""
+        months = sorted({d[:7] for d in dates})
+        query = {"month": {"$in": months}}
+        if student_ids is not None:
+            query["studentId"] = {"$in": list(student_ids)}
+        projection = {"_id": 0, "studentId": 1}
+        projection.update({f"days.{date_str}": 1 for date_str in dates})
+        totals = {}
+        for summary in mongo.db.daily_log_summaries.find(query, projection):
+            hours = sum(summary.get('days', {}).values())
+            if hours:
+                totals[summary['studentId']] = totals.get(summary['studentId'], 0) + hours
+        return totals
+
+    @staticmethod
+    def delete_for_student(student_id):
+        return mongo.db.daily_log_summaries.delete_many({"studentId": student_id}).deleted_count
+
+    @staticmethod
+    def _ensure_indexes():
+        if LogSummary._indexed:
+            return
+        mongo.db.daily_log_summaries.create_index([("studentId", 1), ("month", 1), ("subjectId", 1)])
+        mongo.db.daily_log_summaries.create_index(
+            [("studentId", 1), ("subjectId", 1), ("month", 1)], unique=True
+        )
+        LogSummary._indexed = True
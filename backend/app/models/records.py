@@ -0,0 +1,79 @@
+"""Lean read models for the hot read paths.
+
+Each record type declares the Mongo projection it needs and keeps only
+those fields in `__slots__`, so rows cost a fraction of a decoded document
+dict and fields not needed by the view never leave the server.
+"""
+
+class LogEntry:
+    __slots__ = ('id', 'subject_id', 'date', 'hours_spent')
+    PROJECTION = {"subjectId": 1, "date": 1, "hoursSpent": 1}
+
+    def __init__(self, id, subject_id, date, hours_spent):
+        self.id = id
+        self.subject_id = subject_id
+        self.date = date
+        self.hours_spent = hours_spent
+
+    @classmethod
+    def from_doc(cls, doc):
+        return cls(doc['_id'], doc.get('subjectId'), doc['date'], doc.get('hoursSpent', 0))
+
+    def to_dict(self, subject_name):
+        return {
+            "_id": str(self.id),
+            "subjectId": subject_name,
+            "date": self.date,
+            "hoursSpent": self.hours_spent
+        }
+
+class TimetableSlot:
+    __slots__ = ('id', 'subject_id', 'day_of_week', 'planned_hours', 'actual_hours', 'start_date', 'end_date')
+    PROJECTION = {
+        "subjectId": 1,
+        "dayOfWeek": 1,
+        "plannedHours": 1,
+        "actualHours": 1,
+        "startDate": 1,
+        "endDate": 1
+    }
+
+    def __init__(self, doc):
+        self.id = doc['_id']
+        self.subject_id = doc.get('subjectId')
+        self.day_of_week = doc['dayOfWeek']
+        self.planned_hours = doc.get('plannedHours', 0)
+        self.actual_hours = doc.get('actualHours', 0)
+        self.start_date = doc.get('startDate')
+        self.end_date = doc.get('endDate')
+
+    def to_dict(self, subject_name):
+        return {
+            "_id": str(self.id),
+            "subjectId": subject_name,
+            "dayOfWeek": self.day_of_week,
+            "plannedHours": self.planned_hours,
+            "actualHours": self.actual_hours,
+            "startDate": self.start_date,
+            "endDate": self.end_date
+        }
+
+class TaskRecord:
+    __slots__ = ('id', 'student_id', 'title', 'date', 'is_completed')
+    PROJECTION = {"studentId": 1, "title": 1, "date": 1, "isCompleted": 1}
+
+    def __init__(self, doc):
+        self.id = doc['_id']
+        self.student_id = doc['studentId']
+        self.title = doc['title']
+        self.date = doc['date']
+        self.is_completed = doc.get('isCompleted', False)
+
+    def to_dict(self):
+        return {
+            "_id": str(self.id),
+            "studentId": self.student_id,
+            "title": self.title,
+            "date": self.date,
+            "isCompleted": self.is_completed
+        }
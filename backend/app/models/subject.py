@@ -0,0 +1,87 @@
+import threading
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.extensions import mongo
+
+# In-process lookups; a subject's key never changes once assigned
+_keys = {} # (studentId, name) -> key
+_names = {} # (studentId, key) -> name
+_lock = threading.Lock()
+_MAX_CACHED = 200000
+
+class SubjectCatalog:
+    """Per-student catalog mapping subject names to small integer keys.
+
+    daily_logs, timetables and daily_log_summaries store the key in
+    `subjectId`; the API keeps accepting and returning names. Documents not
+    yet rewritten by the migration still hold the name itself, so readers
+    go through `get_name`, which passes strings through unchanged.
+    """
+    _indexed = False
+
+    @staticmethod
+    def get_key(student_id, name):
+        """Key for `name`, assigning the next free one on first use."""
+        name = str(name)
+        key = _keys.get((student_id, name))
+        if key is not None:
+            return key
+
+        SubjectCatalog._ensure_indexes()
+        doc = mongo.db.subjects.find_one({"studentId": student_id, "name": name})
+        if doc:
+            key = doc['key']
+        else:
+            counter = mongo.db.subject_counters.find_one_and_update(
+                {"_id": student_id},
+                {"$inc": {"seq": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            try:
+                mongo.db.subjects.insert_one({"studentId": student_id, "name": name, "key": counter['seq']})
+                key = counter['seq']
+            except DuplicateKeyError:
+                # Another request registered the same name first
+                key = mongo.db.subjects.find_one({"studentId": student_id, "name": name})['key']
+
+        SubjectCatalog._remember(student_id, name, key)
+        return key
+
+    @staticmethod
+    def get_name(student_id, value):
+        """Decode a stored subjectId: integer keys via the catalog, legacy
+        name strings as they are."""
+        if not isinstance(value, int):
+            return value
+        name = _names.get((student_id, value))
+        if name is None:
+            for doc in mongo.db.subjects.find({"studentId": student_id}):
+                SubjectCatalog._remember(student_id, doc['name'], doc['key'])
+            name = _names.get((student_id, value), str(value))
+        return name
+
+    @staticmethod
+    def match(student_id, name):
+        """Query value matching a subject whether or not the document has
+        been migrated to its key yet."""
+        return {"$in": [SubjectCatalog.get_key(student_id, name), str(name)]}
+
+    @staticmethod
+    def _remember(student_id, name, key):
+        with _lock:
+            if len(_keys) >= _MAX_CACHED:
+                _keys.clear()
+                _names.clear()
+            _keys[(student_id, name)] = key
+            _names[(student_id, key)] = name
+
+    @staticmethod
+    def _ensure_indexes():
+        if SubjectCatalog._indexed:
+            return
+        mongo.db.subjects.create_index([("studentId", 1), ("name", 1)], unique=True)
+        mongo.db.subjects.create_index([("studentId", 1), ("key", 1)], unique=True)
+        SubjectCatalog._indexed = True
@@ -1,5 +1,12 @@
 from app.extensions import mongo
+from app.models.records import TimetableSlot
+from app.models.subject import SubjectCatalog
+from app.models.tombstone import Tombstone
+from app.services.event_bus import event_bus
+from app.services.plan_resolver import PlanResolver
+from app.services.read_router import read_router
 from bson.objectid import ObjectId
+from datetime import datetime
 
 class Timetable:
     @staticmethod
@@ -8,13 +15,15 @@ class Timetable:
         # Note: If we want to support multiple date ranges for same subject/day, 
         # we might need to change the unique identifier logic. 
         # For now, we update the existing one or create new.
+        subject_key = SubjectCatalog.get_key(student_id, subject_id)
         query = {
             "studentId": student_id,
-            "subjectId": subject_id,
+            "subjectId": SubjectCatalog.match(student_id, subject_id),
             "dayOfWeek": day_of_week
         }
         
         set_fields = {
+            "subjectId": subject_key, # also migrates a legacy name in place
             "plannedHours": planned_hours
         }
         if start_date:
@@ -23,19 +32,78 @@ class Timetable:
             set_fields["endDate"] = end_date
 
         update = {
-            "$set": set_fields,
+            "$set": dict(set_fields, updatedAt=datetime.utcnow()),
             "$setOnInsert": {
                 "actualHours": 0
             }
         }
-        mongo.db.timetables.update_one(query, update, upsert=True)
+        with read_router.write_session([student_id]) as session:
+            mongo.db.timetables.update_one(query, update, upsert=True, session=session)
+            Timetable._bump_plan_version(student_id, session)
+        PlanResolver.invalidate(student_id)
+        event_bus.notify('timetables', 'update', dict(set_fields, studentId=student_id, dayOfWeek=day_of_week))
 
     @staticmethod
-    def get_student_timetable(student_id):
-        return list(mongo.db.timetables.find({"studentId": student_id}))
+    def get_student_timetable(student_id, session=None, day_of_week=None, operation='timetable'):
+        query = {"studentId": student_id}
+        if day_of_week is not None:
+            query["dayOfWeek"] = day_of_week
+        cursor = read_router.db(operation).timetables.find(query, TimetableSlot.PROJECTION, session=session)
+        return [TimetableSlot(slot) for slot in cursor]
 
     @staticmethod
-    def delete_all(student_id):
-        print(f"DEBUG: delete_all called for student_id: {student_id} (type: {type(student_id)})")
-        result = mongo.db.timetables.delete_many({"studentId": student_id})
-        print(f"DEBUG: Deleted count: {result.deleted_count}")
+    def plan_version(student_id, session=None, operation='timetable'):
+        """Counter bumped after every change to the student's planned slots
+        (not their actualHours), so an unchanged version means an unchanged
+        plan. 0 until the plan is first written."""
+        version = read_router.db(operation).plan_versions.find_one({"_id": student_id}, {"version": 1}, session=session)
+        return version['version'] if version else 0
+
+    @staticmethod
+    def slots_by_student(first_date, last_date):
+        """{studentId: [TimetableSlot]} of every slot version in force at
+        some point between the two dates, fetched in one query."""
+        open_ended = [None, ""]
+        cursor = read_router.db('stats').timetables.find(
+            {"$and": [
+                {"$or": [{"startDate": {"$in": open_ended}}, {"startDate": {"$lte": last_date}}]},
+                {"$or": [{"endDate": {"$in": open_ended}}, {"endDate": {"$gte": first_date}}]}
+            ]},
+            dict(TimetableSlot.PROJECTION, studentId=1)
+        )
+        slots = {}
+        for slot in cursor:
+            slots.setdefault(slot['studentId'], []).append(TimetableSlot(slot))
+        return slots
+
+    @staticmethod
+    def delete_batch(student_id, after_id=None, limit=500):
+        # Same contract as DailyLog.delete_batch
+        query = {"studentId": student_id}
+        if after_id:
+            query["_id"] = {"$gt": after_id}
+        ids = [doc['_id'] for doc in mongo.db.timetables.find(query, {"_id": 1}).sort("_id", 1).limit(limit)]
+        if not ids:
+            return 0, None
+
+        result = mongo.db.timetables.delete_many({
+            "studentId": student_id,
+            "_id": {"$gte": ids[0], "$lte": ids[-1]}
+        })
+        Timetable._bump_plan_version(student_id)
+        PlanResolver.invalidate(student_id)
+        return result.deleted_count, ids[-1]
+
+    @staticmethod
+    def finish_reset(student_id):
+        """Run once every slot of the student has been deleted."""
+        Timetable._bump_plan_version(student_id)
+        PlanResolver.invalidate(student_id)
+        Tombstone.record_reset(student_id, 'timetable')
+        event_bus.publish(student_id, {"type": "reset", "kind": "timetable"})
+
+    @staticmethod
+    def _bump_plan_version(student_id, session=None):
+        # After the slot write: a reader that saw the new slots with the old
+        # version caches them under a version that is already stale
+        mongo.db.plan_versions.update_one({"_id": student_id}, {"$inc": {"version": 1}}, upsert=True, session=session)
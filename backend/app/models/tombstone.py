@@ -0,0 +1,34 @@
+from app.extensions import mongo
+from datetime import datetime
+
+class Tombstone:
+    """Deletions for delta sync. `collection` is the sync key ('logs',
+    'timetable' or 'tasks'). A 'reset' tombstone stands for a bulk delete
+    of everything the student had in that collection."""
+
+    @staticmethod
+    def record_delete(student_id, collection, doc_id):
+        mongo.db.tombstones.insert_one({
+            "studentId": student_id,
+            "collection": collection,
+            "kind": "delete",
+            "docId": str(doc_id),
+            "updatedAt": datetime.utcnow()
+        })
+
+    @staticmethod
+    def record_reset(student_id, collection):
+        mongo.db.tombstones.insert_one({
+            "studentId": student_id,
+            "collection": collection,
+            "kind": "reset",
+            "docId": None,
+            "updatedAt": datetime.utcnow()
+        })
+
+    @staticmethod
+    def get_since(student_id, since):
+        return list(mongo.db.tombstones.find(
+            {"studentId": student_id, "updatedAt": {"$gt": since}},
+            {"_id": 0, "collection": 1, "kind": 1, "docId": 1}
+        ).sort("updatedAt", 1))
@@ -0,0 +1,159 @@
+from app.extensions import mongo
+from bson.objectid import ObjectId
+from datetime import datetime, timedelta
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+class WeeklyTotal:
+    """Hours logged per (studentId, week), kept current with an $inc on
+    every log write so rankings read one small document per student
+    instead of the raw logs. `week` is the Monday of the week (YYYY-MM-DD)."""
+    _indexed = False
+
+    @staticmethod
+    def week_of(date_str):
+        day = datetime.strptime(date_str, '%Y-%m-%d')
+        return (day - timedelta(days=day.weekday())).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def week_dates(week):
+        monday = datetime.strptime(week, '%Y-%m-%d')
+        return [(monday + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
+
+    @staticmethod
+    def inc_op(student_id, date_str, hours, now=None):
+        """UpdateOne adding `hours` to the student's total for the week of
+        `date_str`, for callers that batch their writes."""
+        return UpdateOne(*WeeklyTotal._inc(student_id, date_str, hours, now), upsert=True)
+
+    @staticmethod
+    def add(student_id, date_str, hours, session=None):
+        query, update = WeeklyTotal._inc(student_id, date_str, hours)
+        mongo.db.weekly_totals.update_one(query, update, upsert=True, session=session)
+
+    @staticmethod
+    def _inc(student_id, date_str, hours, now=None):
+        # The unique index must exist before the first upsert, or racing
+        # upserts can create duplicate totals
+        WeeklyTotal._ensure_indexes()
+        return (
+            {"studentId": student_id, "week": WeeklyTotal.week_of(date_str)},
+            {"$inc": {"hours": float(hours)}, "$set": {"updatedAt": now or datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def get(student_id, week):
+        total = mongo.db.weekly_totals.find_one({"studentId": student_id, "week": week}, {"hours": 1})
+        return total['hours'] if total else 0
+
+    @staticmethod
+    def for_week(week):
+        """{studentId: hours} for every student with a total that week."""
+        cursor = mongo.db.weekly_totals.find({"week": week}, {"_id": 0, "studentId": 1, "hours": 1})
+        return {total['studentId']: total['hours'] for total in cursor}
+
+    @staticmethod
+    def changed_since(week, since):
+        WeeklyTotal._ensure_indexes()
+        return mongo.db.weekly_totals.find_one(
+            {"week": week, "updatedAt": {"$gt": since}}, {"_id": 1}
+        ) is not None
+
+    @staticmethod
+    def rebuild_week(week, recount, rounds=3):
+        """Correct the week's totals to hours recounted from the logs
+        without losing increments that race the rebuild. `recount(ids)`
+        returns {studentId: hours} for the given students (every student
+        when ids is None).
+
+        A student's total is corrected by the difference to the recount,
+        and only if it didn't move while the recount ran; the correction
+        is conditional on the total being unchanged since, so an $inc
+        landing in between is kept. Students that moved are recounted
+        again, up to `rounds` times; any left after that keep their
+        incremental total. Returns those students.
+
+        Logs and their $inc are separate writes, so an $inc still in flight
+        for a log the recount already saw is counted twice; that window is
+        the length of one log write."""
+        WeeklyTotal._ensure_indexes()
+        pending = None
+        for _ in range(rounds):
+            before = WeeklyTotal._snapshot(week, pending)
+            recounted = recount(pending)
+            after = WeeklyTotal._snapshot(week, pending)
+
+            # Stamped on every correction of this round to tell which landed
+            generation = ObjectId()
+            now = datetime.utcnow()
+            moved = set()
+            attempted = []
+            ops = []
+            for student_id in set(recounted) | set(after):
+                current = after.get(student_id)
+                if before.get(student_id) != current:
+                    moved.add(student_id)
+                    continue
+                hours = float(recounted.get(student_id, 0))
+                if current is None:
+                    if not hours:
+                        continue
+                    # Only if no $inc has created the total meanwhile
+                    ops.append(UpdateOne(
+                        {"studentId": student_id, "week": week},
+                        {"$setOnInsert": {"hours": hours, "updatedAt": now, "rebuild": generation}},
+                        upsert=True
+                    ))
+                elif current[0] != hours:
+                    ops.append(UpdateOne(
+                        {"studentId": student_id, "week": week, "hours": current[0], "updatedAt": current[1]},
+                        {"$inc": {"hours": hours - current[0]}, "$set": {"updatedAt": now, "rebuild": generation}}
+                    ))
+                else:
+                    continue
+                attempted.append(student_id)
+
+            if ops:
+                try:
+                    mongo.db.weekly_totals.bulk_write(ops, ordered=False)
+                except BulkWriteError:
+                    # Lost insert races on the unique index; retried below
+                    pass
+                applied = {
+                    total['studentId'] for total in mongo.db.weekly_totals.find(
+                        {"week": week, "studentId": {"$in": attempted}, "rebuild": generation},
+                        {"_id": 0, "studentId": 1}
+                    )
+                }
+                moved.update(student_id for student_id in attempted if student_id not in applied)
+
+            pending = sorted(moved)
+            if not pending:
+                break
+        return set(pending)
+
+    @staticmethod
+    def _snapshot(week, student_ids=None):
+        # {studentId: (hours, updatedAt)}; updatedAt changes on every write
+        query = {"week": week}
+        if student_ids is not None:
+            query["studentId"] = {"$in": list(student_ids)}
+        cursor = mongo.db.weekly_totals.find(query, {"_id": 0, "studentId": 1, "hours": 1, "updatedAt": 1})
+        return {total['studentId']: (total['hours'], total.get('updatedAt')) for total in cursor}
+
+    @staticmethod
+    def clear(student_id):
+        WeeklyTotal._ensure_indexes()
+        # Zeroed rather than deleted so the change is visible to refreshes
+        mongo.db.weekly_totals.update_many(
+            {"studentId": student_id},
+            {"$set": {"hours": 0, "updatedAt": datetime.utcnow()}}
+        )
+
+    @staticmethod
+    def _ensure_indexes():
+        if WeeklyTotal._indexed:
+            return
+        mongo.db.weekly_totals.create_index([("studentId", ASCENDING), ("week", ASCENDING)], unique=True)
+        mongo.db.weekly_totals.create_index([("week", ASCENDING), ("updatedAt", DESCENDING)])
+        WeeklyTotal._indexed = True
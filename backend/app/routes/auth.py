@@ -1,7 +1,7 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app.models.user import User
-from app.extensions import mongo
+from app.services.read_router import read_router
 from bson.objectid import ObjectId
 
 auth_bp = Blueprint('auth', __name__)
@@ -78,7 +78,7 @@ def login():
 @jwt_required()
 def me():
     current_user_id = get_jwt_identity()
-    user_data = mongo.db.users.find_one({"_id": ObjectId(current_user_id)})
+    user_data = read_router.db('me').users.find_one({"_id": ObjectId(current_user_id)})
     
     if not user_data:
         return jsonify({"message": "User not found"}), 404
@@ -21,7 +21,7 @@ def get_tasks():
         return jsonify({"message": "Date is required"}), 400
 
     tasks = DailyTask.get_by_date(student_id, date)
-    return jsonify(tasks), 200
+    return jsonify([task.to_dict() for task in tasks]), 200
 
 @daily_tasks_bp.route('/', methods=['POST'])
 @jwt_required()
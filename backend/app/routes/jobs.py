@@ -0,0 +1,28 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.models.job import Job
+from bson.errors import InvalidId
+
+jobs_bp = Blueprint('jobs', __name__)
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    try:
+        job = Job.get(job_id)
+    except InvalidId:
+        return jsonify({"message": "Invalid job id"}), 400
+
+    if not job:
+        return jsonify({"message": "Job not found"}), 404
+
+    return jsonify({
+        "id": job['_id'],
+        "kind": job['kind'],
+        "studentId": job['studentId'],
+        "status": job['status'],
+        "deleted": job['deleted'],
+        "error": job.get('error'),
+        "createdAt": job['createdAt'].isoformat(),
+        "updatedAt": job['updatedAt'].isoformat()
+    }), 200
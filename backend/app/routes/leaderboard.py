@@ -0,0 +1,61 @@
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.models.weekly_total import WeeklyTotal
+from app.services.leaderboard_service import LeaderboardService
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+def _week_param():
+    # Any date in the week selects it; defaults to the current week
+    date_param = request.args.get('week')
+    if not date_param:
+        return LeaderboardService.current_week()
+    return WeeklyTotal.week_of(date_param)
+
+def _not_computed(week):
+    # Boards are only computed by the scheduler; queue this week for it
+    if not LeaderboardService.request_board(week):
+        return jsonify({"message": "Too many leaderboards are being computed, try again later"}), 503
+    return jsonify({"message": "Leaderboard is being computed, try again shortly", "week": week}), 202
+
+def _out_of_range(week):
+    return jsonify({"message": "No leaderboard for this week", "week": week}), 404
+
+@leaderboard_bp.route('/', methods=['GET'])
+@jwt_required()
+def get_leaderboard():
+    top_k = current_app.config['LEADERBOARD_TOP_K']
+    try:
+        week = _week_param()
+        k = min(max(int(request.args.get('k', 10)), 1), top_k)
+    except ValueError:
+        return jsonify({"message": "Invalid week or k"}), 400
+    if not LeaderboardService.in_range(week):
+        return _out_of_range(week)
+
+    board = LeaderboardService.get_board(week)
+    if board is None:
+        return _not_computed(week)
+    return jsonify({
+        "week": week,
+        "students": board['students'],
+        "byHours": board['byHours'][:k],
+        "byAdherence": board['byAdherence'][:k],
+        "computedAt": board['computedAt'].isoformat()
+    }), 200
+
+@leaderboard_bp.route('/<student_id>', methods=['GET'])
+@jwt_required()
+def get_standing(student_id):
+    try:
+        week = _week_param()
+    except ValueError:
+        return jsonify({"message": "Invalid week"}), 400
+    if not LeaderboardService.in_range(week):
+        return _out_of_range(week)
+
+    standing = LeaderboardService.student_standing(student_id, week)
+    if standing is None:
+        return _not_computed(week)
+    standing['computedAt'] = standing['computedAt'].isoformat()
+    return jsonify(standing), 200
@@ -1,6 +1,9 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.log import DailyLog
+from app.services.log_buffer import log_buffer
+from app.services.reset_service import ResetService
+from app.services.retention_service import RetentionService
 
 logs_bp = Blueprint('logs', __name__)
 
@@ -16,6 +19,13 @@ def create_log():
     
     if not all([student_id, subject_id, date, hours_spent]):
         return jsonify({"message": "Missing fields"}), 400
+
+    # Timer ticks carry no notes and can be coalesced; anything with notes
+    # keeps its own document
+    if current_app.config['LOG_INGEST_MODE'] == 'buffered' and not notes:
+        if not log_buffer.add(student_id, subject_id, date, hours_spent):
+            return jsonify({"message": "Log could not be saved"}), 503
+        return jsonify({"message": "Log accepted"}), 202
         
     log_id = DailyLog.create(student_id, subject_id, date, hours_spent, notes)
     return jsonify({"message": "Log created", "id": log_id}), 201
@@ -27,6 +37,10 @@ def reset_logs():
     user_id = get_jwt_identity()
     
     target_id = student_id if student_id else user_id
+    # The reset also removes the student's archive files by name
+    if not RetentionService.valid_archive_id(target_id):
+        return jsonify({"message": "Invalid studentId"}), 400
     
-    count = DailyLog.delete_all(target_id)
-    return jsonify({"message": f"Deleted {count} logs and reset usage."}), 200
+    # Runs in the background; poll /api/jobs/<jobId> for progress
+    job_id = ResetService.start('logs', target_id)
+    return jsonify({"message": "Log reset started", "jobId": job_id}), 202
@@ -0,0 +1,13 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from app.services.read_router import read_metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/reads', methods=['GET'])
+@jwt_required()
+def read_split():
+    # Read commands served by each replica set member since process start
+    members = read_metrics.snapshot()
+    totals = {member: sum(commands.values()) for member, commands in members.items()}
+    return jsonify({"members": members, "totals": totals}), 200
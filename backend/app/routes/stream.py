@@ -0,0 +1,34 @@
+import json
+from flask import Blueprint, Response, jsonify, current_app
+from flask_jwt_extended import jwt_required
+from app.services.event_bus import event_bus
+
+stream_bp = Blueprint('stream', __name__)
+
+# EventSource cannot set headers, so the token may also come as ?jwt=
+@stream_bp.route('/<student_id>', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream(student_id):
+    subscriber = event_bus.subscribe(student_id)
+    if subscriber is None:
+        return jsonify({"message": "Too many open streams"}), 503
+
+    heartbeat = current_app.config['STREAM_HEARTBEAT_SECONDS']
+
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                events = subscriber.wait(heartbeat)
+                if not events:
+                    # Comment line keeps proxies from closing idle connections
+                    yield ": ping\n\n"
+                for event in events:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            event_bus.unsubscribe(student_id, subscriber)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
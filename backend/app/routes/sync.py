@@ -0,0 +1,20 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.services.sync_service import SyncService
+
+sync_bp = Blueprint('sync', __name__)
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+def sync():
+    student_id = request.args.get('studentId') or get_jwt_identity()
+    token = request.args.get('since')
+
+    since = None
+    if token:
+        try:
+            since = SyncService.decode_cursor(token)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({"message": "Invalid sync cursor"}), 400
+
+    return jsonify(SyncService.changes_since(student_id, since)), 200
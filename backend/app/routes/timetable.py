@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.models.log import DailyLog
+from app.models.subject import SubjectCatalog
 from app.models.timetable import Timetable
-from app.extensions import mongo
+from app.services.plan_resolver import PlanResolver
+from app.services.read_router import read_router
+from app.services.reset_service import ResetService
 from bson.objectid import ObjectId
 
 timetable_bp = Blueprint('timetable', __name__)
@@ -27,41 +31,17 @@ def get_timetable(student_id):
         today = datetime.now()
 
     start_of_week = today - timedelta(days=today.weekday())
-    end_of_week = start_of_week + timedelta(days=6)
-    week_start_str = start_of_week.strftime('%Y-%m-%d')
-    week_end_str = end_of_week.strftime('%Y-%m-%d')
-    
     week_dates = [(start_of_week + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
 
-    # Fetch Timetable (Plan)
-    all_entries = Timetable.get_student_timetable(student_id)
-    
-    # Filter entries based on date range
-    timetable_entries = []
-    for entry in all_entries:
-        # If no dates set, assume valid forever
-        valid_start = entry.get('startDate')
-        valid_end = entry.get('endDate')
-        
-        # Check if the plan's validity overlaps with the current week
-        # Plan is valid if: (Start <= WeekEnd) AND (End >= WeekStart)
-        # Handle cases where start/end might be missing (valid forever)
-        
-        is_valid = True
-        if valid_start and valid_start > week_end_str:
-            is_valid = False
-        if valid_end and valid_end < week_start_str:
-            is_valid = False
-            
-        if is_valid:
-            timetable_entries.append(entry)
+    with read_router.read_session(student_id) as session:
+        # Fetch Timetable (Plan): for each day of the week, the plan
+        # versions whose startDate/endDate cover that date
+        slots_by_date = PlanResolver.slots_for_dates(student_id, week_dates, session)
 
-    
-    # Fetch Logs (Actuals) for the week
-    logs_cursor = mongo.db.daily_logs.find({
-        "studentId": student_id,
-        "date": {"$in": week_dates}
-    })
+        # Fetch Logs (Actuals) for the week
+        logs_cursor = DailyLog.get_by_dates(student_id, week_dates, session)
+
+    timetable_entries = [slot for date_str in week_dates for slot in slots_by_date[date_str]]
 
     # Merge Data
     # Key: (day_of_week, subject_id)
@@ -69,24 +49,25 @@ def get_timetable(student_id):
 
     # 1. Process Plan
     for entry in timetable_entries:
-        key = (entry['dayOfWeek'], entry['subjectId'])
+        subject_id = SubjectCatalog.get_name(student_id, entry.subject_id)
+        key = (entry.day_of_week, subject_id)
         merged_data[key] = {
-            "dayOfWeek": entry['dayOfWeek'],
-            "subjectId": entry['subjectId'],
-            "plannedHours": float(entry.get('plannedHours', 0)),
+            "dayOfWeek": entry.day_of_week,
+            "subjectId": subject_id,
+            "plannedHours": float(entry.planned_hours),
             "actualHours": 0,
-            "startDate": entry.get('startDate'),
-            "endDate": entry.get('endDate'),
-            "_id": str(entry['_id']) # Preserve ID if available from plan
+            "startDate": entry.start_date,
+            "endDate": entry.end_date,
+            "_id": str(entry.id) # Preserve ID if available from plan
         }
 
     # 2. Process Actuals
     for log in logs_cursor:
         # Determine day of week from date string
-        log_date = datetime.strptime(log['date'], "%Y-%m-%d")
+        log_date = datetime.strptime(log.date, "%Y-%m-%d")
         day_of_week = log_date.weekday()
-        subject_id = log['subjectId']
-        hours = float(log.get('hoursSpent', 0))
+        subject_id = SubjectCatalog.get_name(student_id, log.subject_id)
+        hours = float(log.hours_spent)
 
         key = (day_of_week, subject_id)
         if key not in merged_data:
@@ -95,7 +76,7 @@ def get_timetable(student_id):
                 "subjectId": subject_id,
                 "plannedHours": 0,
                 "actualHours": 0,
-                "_id": str(log['_id']) # Use log ID if no plan exists
+                "_id": str(log.id) # Use log ID if no plan exists
             }
         
         merged_data[key]['actualHours'] += hours
@@ -132,5 +113,6 @@ def reset_timetable():
     # For now, we trust the studentId passed or default to user_id if not passed
     target_id = student_id if student_id else user_id
     
-    Timetable.delete_all(target_id)
-    return jsonify({"message": "Timetable reset successfully"}), 200
+    # Runs in the background; poll /api/jobs/<jobId> for progress
+    job_id = ResetService.start('timetable', target_id)
+    return jsonify({"message": "Timetable reset started", "jobId": job_id}), 202
@@ -0,0 +1,237 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+from app.extensions import mongo
+from app.models.subject import SubjectCatalog
+
+# Fields sent to clients per collection; everything else stays server side
+DELTA_FIELDS = {
+    "daily_logs": ("log", ("subjectId", "date", "hoursSpent")),
+    "timetables": ("timetable", ("subjectId", "dayOfWeek", "plannedHours", "actualHours", "startDate", "endDate")),
+    "daily_tasks": ("task", ("title", "date", "isCompleted"))
+}
+
+def make_delta(collection, op, doc):
+    event_type, fields = DELTA_FIELDS[collection]
+    data = {field: doc[field] for field in fields if field in doc}
+    if '_id' in doc:
+        data['_id'] = str(doc['_id'])
+    if 'subjectId' in data:
+        data['subjectId'] = SubjectCatalog.get_name(doc['studentId'], data['subjectId'])
+    return {"type": event_type, "op": op, "data": data}
+
+class Subscriber:
+    """One open stream. Holds at most `maxlen` undelivered events; older
+    ones are dropped and the client is told to resync instead."""
+    __slots__ = ('events', 'ready', 'overflowed')
+
+    def __init__(self, maxlen):
+        self.events = deque(maxlen=maxlen)
+        self.ready = threading.Event()
+        self.overflowed = False
+
+    def push(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.overflowed = True
+        self.events.append(event)
+        self.ready.set()
+
+    def wait(self, timeout):
+        """Block up to `timeout` seconds; return pending events (may be empty)."""
+        self.ready.wait(timeout)
+        self.ready.clear()
+        events = []
+        if self.overflowed:
+            self.overflowed = False
+            self.events.clear()
+            return [{"type": "resync"}]
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+class EventBus:
+    """Per-student fan-out of change deltas to open SSE connections.
+
+    Each worker process holds its own subscribers, so events reach them
+    through MongoDB, depending on the resolved source:
+      - 'change_stream': inserts and updates come from a change stream;
+        deletes and resets, which a change stream can't attribute to a
+        student, are written to the capped `stream_events` collection.
+      - 'capped': every event goes through `stream_events`.
+      - 'local': in-process only, for a single-process server.
+    'auto' picks change_stream on a replica set and capped otherwise.
+    Every process tails `stream_events` while it has open streams.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {} # studentId -> set of Subscriber
+        self._count = 0
+        self._listeners = None
+        self._mode = None
+        self._events_ready = False
+
+    def init_app(self, app):
+        self.source = app.config['STREAM_SOURCE']
+        self.queue_size = app.config['STREAM_QUEUE_SIZE']
+        self.max_subscribers = app.config['STREAM_MAX_SUBSCRIBERS']
+        self.events_size = app.config['STREAM_EVENTS_SIZE_BYTES']
+
+    def subscribe(self, student_id):
+        """Register a new stream, or return None when the worker is full."""
+        self._ensure_listening()
+        with self._lock:
+            if self._count >= self.max_subscribers:
+                return None
+            subscriber = Subscriber(self.queue_size)
+            self._subscribers.setdefault(student_id, set()).add(subscriber)
+            self._count += 1
+        return subscriber
+
+    def unsubscribe(self, student_id, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(student_id)
+            if subscribers and subscriber in subscribers:
+                subscribers.discard(subscriber)
+                self._count -= 1
+                if not subscribers:
+                    del self._subscribers[student_id]
+
+    def publish(self, student_id, event):
+        """Send an event to the student's streams in every process."""
+        self.publish_many([(student_id, event)])
+
+    def publish_many(self, events):
+        """Like publish, for a list of (studentId, event) pairs."""
+        if not events:
+            return
+        if self._get_mode() == 'local':
+            for student_id, event in events:
+                self._deliver(student_id, event)
+            return
+        self._ensure_events_collection()
+        mongo.db.stream_events.insert_many(
+            [{"studentId": student_id, "event": event} for student_id, event in events],
+            ordered=False
+        )
+
+    def notify(self, collection, op, doc):
+        """Called by the models after a write."""
+        self.notify_many(collection, op, [doc])
+
+    def notify_many(self, collection, op, docs):
+        mode = self._get_mode()
+        # The change stream delivers the same change to every process
+        if mode == 'change_stream':
+            return
+        if mode == 'local' and not self._subscribers:
+            return
+        self.publish_many([(doc['studentId'], make_delta(collection, op, doc)) for doc in docs])
+
+    def _deliver(self, student_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(student_id, ()))
+        for subscriber in subscribers:
+            subscriber.push(event)
+
+    def _resync_all(self):
+        # Events may have been missed; clients reload instead
+        with self._lock:
+            subscribers = [s for group in self._subscribers.values() for s in group]
+        for subscriber in subscribers:
+            subscriber.push({"type": "resync"})
+
+    def _get_mode(self):
+        if self._mode is None:
+            mode = self.source
+            if mode == 'auto':
+                try:
+                    hello = mongo.cx.admin.command('hello')
+                except PyMongoError as e:
+                    # Not cached, the next call asks again
+                    logging.warning("Could not detect the deployment type: %s", str(e))
+                    return 'capped'
+                replicated = 'setName' in hello or hello.get('msg') == 'isdbgrid'
+                mode = 'change_stream' if replicated else 'capped'
+            self._mode = mode
+        return self._mode
+
+    def _ensure_events_collection(self):
+        if self._events_ready:
+            return
+        try:
+            mongo.db.create_collection('stream_events', capped=True, size=self.events_size)
+        except CollectionInvalid:
+            pass # created by another process
+        self._events_ready = True
+
+    def _ensure_listening(self):
+        mode = self._get_mode()
+        if mode == 'local' or self._listeners:
+            return
+        with self._lock:
+            if self._listeners:
+                return
+            targets = [(self._tail, 'event-bus-tail')]
+            if mode == 'change_stream':
+                targets.append((self._watch, 'event-bus-watch'))
+            self._listeners = [
+                threading.Thread(target=target, name=name, daemon=True) for target, name in targets
+            ]
+            for listener in self._listeners:
+                listener.start()
+
+    def _tail(self):
+        self._ensure_events_collection()
+        newest = mongo.db.stream_events.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        last_id = newest['_id'] if newest else None
+        # Ids are made by each publishing process, so their order can differ
+        # from insertion order; remembered to skip re-reads after a reopen
+        recent = deque(maxlen=1000)
+        while True:
+            if last_id:
+                # Reopened after the cursor died past some position: events
+                # inserted out of _id order around it may be skipped, so
+                # clients reload
+                self._resync_all()
+            try:
+                query = {"_id": {"$gt": last_id}} if last_id else {}
+                cursor = mongo.db.stream_events.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    for doc in cursor:
+                        last_id = doc['_id']
+                        if last_id in recent:
+                            continue
+                        recent.append(last_id)
+                        self._deliver(doc['studentId'], doc['event'])
+            except PyMongoError as e:
+                logging.warning("Event tail interrupted: %s", str(e))
+            # A tailable cursor on an empty collection dies right away
+            time.sleep(1)
+
+    def _watch(self):
+        pipeline = [{"$match": {
+            "ns.coll": {"$in": list(DELTA_FIELDS)},
+            "operationType": {"$in": ["insert", "update", "replace"]}
+        }}]
+        resume_token = None
+        while True:
+            try:
+                with mongo.db.watch(pipeline, full_document='updateLookup', resume_after=resume_token) as stream:
+                    for change in stream:
+                        resume_token = stream.resume_token
+                        doc = change.get('fullDocument')
+                        if doc and 'studentId' in doc:
+                            op = 'insert' if change['operationType'] == 'insert' else 'update'
+                            self._deliver(doc['studentId'], make_delta(change['ns']['coll'], op, doc))
+            except PyMongoError as e:
+                logging.warning("Change stream interrupted: %s", str(e))
+                self._resync_all()
+            time.sleep(5)
+
+event_bus = EventBus()
@@ -0,0 +1,263 @@
+import heapq
+import logging
+from bisect import bisect_right
+from datetime import datetime, timedelta
+
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from flask import current_app
+
+from app.extensions import mongo, scheduler
+from app.models.leaderboard import Leaderboard
+from app.models.lease import Lease
+from app.models.log import DailyLog
+from app.models.log_summary import LogSummary
+from app.models.timetable import Timetable
+from app.models.weekly_total import WeeklyTotal
+from app.services.plan_resolver import PlanResolver
+from app.services.retention_service import RetentionService
+
+class LeaderboardService:
+    """Weekly rankings by hours studied and by plan adherence (hours over
+    planned hours). Boards are computed for all students at once from the
+    weekly_totals rollup and stored per week by the scheduler process;
+    reads only touch the stored board. Percentiles are read off 101 cutoffs
+    (p0..p100) kept with it."""
+
+    @staticmethod
+    def current_week():
+        return WeeklyTotal.week_of(datetime.now().strftime('%Y-%m-%d'))
+
+    @staticmethod
+    def in_range(week):
+        """Whether a board can be asked for: the current week back to
+        LEADERBOARD_HISTORY_WEEKS before it."""
+        current = LeaderboardService.current_week()
+        oldest = datetime.strptime(current, '%Y-%m-%d') - timedelta(weeks=current_app.config['LEADERBOARD_HISTORY_WEEKS'])
+        return oldest.strftime('%Y-%m-%d') <= week <= current
+
+    @staticmethod
+    def get_board(week):
+        """The stored board for the week, or None when none has been
+        computed yet."""
+        return Leaderboard.get(week)
+
+    @staticmethod
+    def request_board(week):
+        """Queue a week without a board for the scheduler. False when
+        LEADERBOARD_MAX_REQUESTS weeks are already waiting."""
+        return Leaderboard.request(week, current_app.config['LEADERBOARD_MAX_REQUESTS'])
+
+    @staticmethod
+    def refresh(week, rebuild=False):
+        """Rank every student for the week and store the board. With
+        `rebuild` the week's totals are first recomputed from the logs (one
+        grouped aggregation, plus the monthly summaries for archived days)
+        instead of trusting the incremental rollup."""
+        # Taken before reading so increments racing the refresh mark it stale
+        computed_at = datetime.utcnow()
+        dates = WeeklyTotal.week_dates(week)
+
+        if rebuild:
+            archived = dates[0] < RetentionService.hot_boundary()
+
+            def recount(student_ids):
+                hours = DailyLog.hours_by_student(dates, student_ids)
+                if archived:
+                    for student_id, summarized in LogSummary.hours_by_student(dates, student_ids).items():
+                        hours[student_id] = hours.get(student_id, 0) + summarized
+                return hours
+
+            unsettled = WeeklyTotal.rebuild_week(week, recount)
+            if unsettled:
+                logging.warning("Kept incremental weekly totals for %d students still logging", len(unsettled))
+        hours = WeeklyTotal.for_week(week)
+
+        days = [(date_str, day_of_week) for day_of_week, date_str in enumerate(dates)]
+        planned = {
+            student_id: PlanResolver.total_planned(slots, days)
+            for student_id, slots in Timetable.slots_by_student(dates[0], dates[-1]).items()
+        }
+
+        board = LeaderboardService._rank(hours, planned, current_app.config['LEADERBOARD_TOP_K'])
+        board['computedAt'] = computed_at
+        Leaderboard.save(week, board)
+        return board
+
+    @staticmethod
+    def student_standing(student_id, week):
+        """The student's live totals for the week placed on the stored
+        board: percentiles, and rank when within the top k. None while the
+        week has no board."""
+        board = Leaderboard.get(week)
+        if board is None:
+            return None
+        hours = WeeklyTotal.get(student_id, week)
+        planned = sum(PlanResolver.planned_hours(student_id, WeeklyTotal.week_dates(week)).values())
+        adherence = round(hours / planned, 4) if planned else None
+
+        return {
+            "studentId": student_id,
+            "week": week,
+            "hours": hours,
+            "plannedHours": planned,
+            "adherence": adherence,
+            "hoursRank": LeaderboardService._rank_in(board['byHours'], student_id),
+            "adherenceRank": LeaderboardService._rank_in(board['byAdherence'], student_id),
+            "hoursPercentile": LeaderboardService._percentile(board['hoursCutoffs'], hours),
+            "adherencePercentile": LeaderboardService._percentile(board['adherenceCutoffs'], adherence),
+            "students": board['students'],
+            "computedAt": board['computedAt']
+        }
+
+    @staticmethod
+    def schedule(app):
+        # Current and previous week, starting right away so a fresh
+        # deployment has a board
+        scheduler.add_job(
+            LeaderboardService._run_scheduled,
+            'interval',
+            args=[app],
+            seconds=app.config['LEADERBOARD_REFRESH_SECONDS'],
+            next_run_time=datetime.now(),
+            id='refresh_leaderboard',
+            replace_existing=True
+        )
+        # Other weeks, once a reader has asked for them
+        scheduler.add_job(
+            LeaderboardService._run_scheduled,
+            'interval',
+            args=[app, True],
+            seconds=app.config['LEADERBOARD_REQUEST_POLL_SECONDS'],
+            id='serve_leaderboard_requests',
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _run_scheduled(app, requested_only=False):
+        with app.app_context():
+            if requested_only:
+                weeks = []
+                for week in Leaderboard.requested():
+                    if LeaderboardService.in_range(week):
+                        weeks.append(week)
+                    else:
+                        # The range moved on since the week was queued
+                        Leaderboard.cancel(week)
+                lease = 'serve_leaderboard_requests'
+            else:
+                current = LeaderboardService.current_week()
+                previous = (datetime.strptime(current, '%Y-%m-%d') - timedelta(days=7)).strftime('%Y-%m-%d')
+                weeks = [current, previous]
+                lease = 'refresh_leaderboard'
+            if weeks:
+                LeaderboardService.refresh_stale(weeks, lease)
+
+    @staticmethod
+    def refresh_stale(weeks, lease='refresh_leaderboard'):
+        """Refresh the weeks whose stored board is stale, rebuilding the
+        totals of those without one. Each job holds its own lease, so a
+        single process across all hosts runs it and queued weeks never
+        hold up the current week's board."""
+        lease_seconds = current_app.config['LEADERBOARD_LEASE_SECONDS']
+        owner = Lease.owner()
+        if not Lease.acquire(lease, owner, lease_seconds):
+            logging.info("Leaderboard: another process holds %s, skipping", lease)
+            return
+        try:
+            for week in weeks:
+                try:
+                    board = Leaderboard.get(week)
+                    if LeaderboardService._is_stale(week, board):
+                        LeaderboardService.refresh(week, rebuild=board is None)
+                except Exception as e:
+                    logging.error("Leaderboard refresh for %s failed: %s", week, str(e))
+                if not Lease.acquire(lease, owner, lease_seconds):
+                    logging.warning("Leaderboard: lost %s, stopping", lease)
+                    break
+        finally:
+            Lease.release(lease, owner)
+
+    @staticmethod
+    def _is_stale(week, board):
+        if board is None:
+            return True
+        config = current_app.config
+        age = (datetime.utcnow() - board['computedAt']).total_seconds()
+        if age < config['LEADERBOARD_REFRESH_SECONDS']:
+            return False
+        # Plan edits don't touch the rollup, so boards also expire by age
+        if age >= config['LEADERBOARD_MAX_AGE_SECONDS']:
+            return True
+        return WeeklyTotal.changed_since(week, board['computedAt'])
+
+    @staticmethod
+    def _rank(hours, planned, k):
+        rows = [] # (studentId, hours, planned, adherence)
+        for student_id in {s for s, h in hours.items() if h > 0} | {s for s, p in planned.items() if p > 0}:
+            student_hours = hours.get(student_id, 0)
+            student_planned = planned.get(student_id, 0)
+            adherence = round(student_hours / student_planned, 4) if student_planned else None
+            rows.append((student_id, student_hours, student_planned, adherence))
+        with_plan = [row for row in rows if row[3] is not None]
+
+        # Ties break on studentId so boards are stable between refreshes
+        by_hours = heapq.nlargest(k, rows, key=lambda row: (row[1], row[0]))
+        by_adherence = heapq.nlargest(k, with_plan, key=lambda row: (row[3], row[0]))
+        hours_cutoffs = LeaderboardService._cutoffs(sorted(row[1] for row in rows))
+        adherence_cutoffs = LeaderboardService._cutoffs(sorted(row[3] for row in with_plan))
+
+        names = LeaderboardService._names({row[0] for row in by_hours + by_adherence})
+
+        def entries(top):
+            return [
+                {
+                    "rank": position + 1,
+                    "studentId": student_id,
+                    "name": names.get(student_id),
+                    "hours": student_hours,
+                    "plannedHours": student_planned,
+                    "adherence": adherence
+                }
+                for position, (student_id, student_hours, student_planned, adherence) in enumerate(top)
+            ]
+
+        return {
+            "students": len(rows),
+            "byHours": entries(by_hours),
+            "byAdherence": entries(by_adherence),
+            "hoursCutoffs": hours_cutoffs,
+            "adherenceCutoffs": adherence_cutoffs
+        }
+
+    @staticmethod
+    def _cutoffs(scores):
+        # Nearest-rank cutoffs for p0..p100 over ascending scores: at least
+        # p% of students score at or below cutoff p
+        if not scores:
+            return []
+        n = len(scores)
+        return [scores[max((p * n + 99) // 100 - 1, 0)] for p in range(101)]
+
+    @staticmethod
+    def _percentile(cutoffs, score):
+        """Highest p whose cutoff the score reaches: the share of students
+        scoring at or below it, rounded down to a whole percent."""
+        if not cutoffs or score is None:
+            return None
+        return max(bisect_right(cutoffs, score) - 1, 0)
+
+    @staticmethod
+    def _rank_in(entries, student_id):
+        return next((entry['rank'] for entry in entries if entry['studentId'] == student_id), None)
+
+    @staticmethod
+    def _names(student_ids):
+        ids = []
+        for student_id in student_ids:
+            try:
+                ids.append(ObjectId(student_id))
+            except (InvalidId, TypeError):
+                pass
+        users = mongo.db.users.find({"_id": {"$in": ids}}, {"name": 1})
+        return {str(user['_id']): user.get('name') for user in users}
@@ -0,0 +1,238 @@
+import atexit
+import logging
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from pymongo.write_concern import WriteConcern
+
+from app.extensions import mongo
+from app.models.subject import SubjectCatalog
+from app.models.weekly_total import WeeklyTotal
+from app.services.event_bus import event_bus
+from app.services.read_router import read_router
+
+class _Batch:
+    """Entries collected during one flush window."""
+    __slots__ = ('entries', 'done', 'failed', 'token')
+
+    def __init__(self):
+        self.entries = {} # (studentId, subjectId, date) -> [hours, count, dayOfWeek]
+        self.done = threading.Event()
+        self.failed = set() # keys whose log upsert did not happen
+        self.token = None # causal token of the write, see ReadRouter
+
+class LogBuffer:
+    """Group-commit write path for high-frequency log entries (study-timer
+    ticks). Entries for the same (student, subject, date) are summed in
+    memory and written as one upsert per key with a single bulk_write."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._batch = _Batch()
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def init_app(self, app):
+        self.window = app.config['LOG_BUFFER_WINDOW_MS'] / 1000.0
+        self.max_keys = app.config['LOG_BUFFER_MAX_KEYS']
+        self.durability = app.config['LOG_BUFFER_DURABILITY']
+        w = app.config['LOG_BUFFER_WRITE_CONCERN']
+        self.write_concern = WriteConcern(w=int(w) if w.isdigit() else w)
+
+    def add(self, student_id, subject_id, date_str, hours_spent, timeout=5):
+        """Buffer one entry. Returns True once it is acknowledged at the
+        configured durability level. False means it was not written and
+        will not be later, so the client can safely retry."""
+        # Parse up front so a bad date fails this request, not the whole flush
+        day_of_week = datetime.strptime(date_str, "%Y-%m-%d").weekday()
+        hours = float(hours_spent)
+        self._ensure_started()
+        key = (student_id, subject_id, date_str)
+
+        with self._lock:
+            # Bounded buffer: a full window is flushed by the caller
+            full = key not in self._batch.entries and len(self._batch.entries) >= self.max_keys
+        if full:
+            self.flush()
+
+        with self._lock:
+            batch = self._batch
+            entry = batch.entries.setdefault(key, [0.0, 0, day_of_week])
+            entry[0] += hours
+            entry[1] += 1
+
+        if self.durability != 'flushed':
+            return True
+        if not batch.done.wait(timeout):
+            with self._lock:
+                if batch is self._batch:
+                    # Not picked up for writing yet: take the entry back so
+                    # the failed request leaves no write behind
+                    entry[0] -= hours
+                    entry[1] -= 1
+                    if not entry[1]:
+                        del batch.entries[key]
+                    return False
+            # Already being written, so its outcome is this entry's outcome
+            batch.done.wait()
+        if key in batch.failed:
+            return False
+        # The flush may have run on another request's thread
+        read_router.remember([student_id], batch.token)
+        return True
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._batch = self._batch, _Batch()
+            try:
+                if batch.entries:
+                    batch.failed, batch.token = self._write(batch.entries)
+            except Exception as e:
+                # Raised before the log upserts were sent
+                logging.error("Failed to flush %d buffered logs: %s", len(batch.entries), str(e))
+                batch.failed = set(batch.entries)
+            finally:
+                batch.done.set()
+
+    def _write(self, entries):
+        """Write one batch; returns the keys whose log upsert did not
+        happen and the write's causal token. The timetable and weekly
+        totals only follow the written ones."""
+        now = datetime.utcnow()
+        # Stamped on every upsert of this flush, so after an ambiguous
+        # error the ones that landed can be read back
+        flush_id = ObjectId()
+        keys = list(entries)
+        stored_keys = {} # (studentId, subject key, date) -> entry key
+        log_ops = []
+
+        for key in keys:
+            student_id, subject_id, date_str = key
+            hours, count, day_of_week = entries[key]
+            subject_key = SubjectCatalog.get_key(student_id, subject_id)
+            stored_keys[(student_id, subject_key, date_str)] = key
+            log_ops.append(UpdateOne(
+                {
+                    "studentId": student_id,
+                    "subjectId": subject_key,
+                    "date": date_str,
+                    "source": "buffer"
+                },
+                {
+                    "$inc": {"hoursSpent": hours, "entryCount": count},
+                    "$set": {"updatedAt": now, "lastFlush": flush_id},
+                    "$setOnInsert": {"notes": "", "createdAt": now}
+                },
+                upsert=True
+            ))
+
+        # Sessions can't carry unacknowledged (w=0) writes. No students are
+        # named here: each add hands the token to its own client
+        if self.write_concern.acknowledged:
+            session_context = read_router.write_session(())
+        else:
+            session_context = nullcontext()
+        with session_context as session:
+            try:
+                mongo.db.daily_logs.with_options(write_concern=self.write_concern).bulk_write(log_ops, ordered=False, session=session)
+                failed = set()
+            except BulkWriteError as e:
+                failed = {keys[error['index']] for error in e.details['writeErrors']}
+                logging.error("Failed to write %d of %d buffered logs", len(failed), len(keys))
+            except PyMongoError as e:
+                logging.error("Flush of %d buffered logs interrupted: %s", len(keys), str(e))
+                failed = self._unwritten(flush_id, stored_keys, session)
+
+            written = [key for key in keys if key not in failed]
+            try:
+                self._write_totals(written, entries, now, session)
+            except PyMongoError as e:
+                # The logs themselves are saved
+                logging.error("Failed to update totals for %d buffered logs: %s", len(written), str(e))
+            token = read_router.token(session)
+
+        try:
+            # Published deltas carry the increment, not the new total
+            event_bus.notify_many('daily_logs', 'inc', [
+                {
+                    "studentId": key[0],
+                    "subjectId": key[1],
+                    "date": key[2],
+                    "hoursSpent": entries[key][0]
+                }
+                for key in written
+            ])
+        except Exception as e:
+            # Must not turn written logs into failed adds
+            logging.warning("Failed to publish buffered log deltas: %s", str(e))
+        return failed, token
+
+    def _unwritten(self, flush_id, stored_keys, session):
+        # Flushes are serialized, so a log still carrying this flush's id
+        # was written by it
+        try:
+            applied = mongo.db.daily_logs.find(
+                {"studentId": {"$in": list({student_id for student_id, _, _ in stored_keys})}, "lastFlush": flush_id},
+                {"_id": 0, "studentId": 1, "subjectId": 1, "date": 1},
+                session=session
+            )
+            written = {stored_keys.get((log['studentId'], log['subjectId'], log['date'])) for log in applied}
+        except PyMongoError as e:
+            logging.error("Could not check which buffered logs were written: %s", str(e))
+            written = set()
+        return set(stored_keys.values()) - written
+
+    def _write_totals(self, keys, entries, now, session):
+        if not keys:
+            return
+        actual_hours = {} # (studentId, subjectId, dayOfWeek) -> hours
+        weekly_hours = {} # (studentId, week) -> hours
+        for student_id, subject_id, date_str in keys:
+            hours, count, day_of_week = entries[(student_id, subject_id, date_str)]
+            tt_key = (student_id, subject_id, day_of_week)
+            actual_hours[tt_key] = actual_hours.get(tt_key, 0) + hours
+            week_key = (student_id, WeeklyTotal.week_of(date_str))
+            weekly_hours[week_key] = weekly_hours.get(week_key, 0) + hours
+
+        timetable_ops = [
+            UpdateOne(
+                {"studentId": student_id, "subjectId": SubjectCatalog.match(student_id, subject_id), "dayOfWeek": day_of_week},
+                {"$inc": {"actualHours": hours}, "$set": {"updatedAt": now}}
+            )
+            for (student_id, subject_id, day_of_week), hours in actual_hours.items()
+        ]
+        weekly_ops = [
+            WeeklyTotal.inc_op(student_id, week, hours, now)
+            for (student_id, week), hours in weekly_hours.items()
+        ]
+        mongo.db.timetables.with_options(write_concern=self.write_concern).bulk_write(timetable_ops, ordered=False, session=session)
+        mongo.db.weekly_totals.with_options(write_concern=self.write_concern).bulk_write(weekly_ops, ordered=False, session=session)
+
+    def _ensure_started(self):
+        if self._thread:
+            return
+        with self._lock:
+            if self._thread:
+                return
+            self._thread = threading.Thread(target=self._run, name='log-buffer', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+
+    def _run(self):
+        while not self._stopping.wait(self.window):
+            self.flush()
+
+    def stop(self):
+        """Stop the flusher and drain whatever is still buffered."""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+        self.flush()
+
+log_buffer = LogBuffer()
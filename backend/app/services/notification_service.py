@@ -1,5 +1,4 @@
 import os
-from twilio.rest import Client
 import logging
 
 class NotificationService:
@@ -14,6 +13,8 @@ class NotificationService:
             return {"status": "mock", "message": message_body}
             
         try:
+            # Imported on first send; the Twilio SDK is slow to import
+            from twilio.rest import Client
             client = Client(sid, auth_token)
             message = client.messages.create(
                 from_=from_number,
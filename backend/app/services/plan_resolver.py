@@ -0,0 +1,113 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import current_app
+
+OPEN_START = ""
+OPEN_END = "9999-12-31"
+
+class _PlanIndex:
+    """Interval index over one student's timetable versions: per day of
+    week, slots sorted by startDate so the versions in force on a date are
+    found by bisection instead of rescanning every slot."""
+    __slots__ = ('starts', 'versions', 'version')
+
+    def __init__(self, slots, version=None):
+        by_day = {}
+        for slot in slots:
+            start = slot.start_date or OPEN_START
+            end = slot.end_date or OPEN_END
+            by_day.setdefault(slot.day_of_week, []).append((start, end, slot))
+
+        self.starts = {}
+        self.versions = {}
+        for day, versions in by_day.items():
+            versions.sort(key=lambda version: version[0])
+            self.starts[day] = [version[0] for version in versions]
+            self.versions[day] = versions
+        self.version = version # Timetable.plan_version the slots were read at
+
+    def slots_on(self, date_str, day_of_week):
+        starts = self.starts.get(day_of_week)
+        if not starts:
+            return []
+        # Versions starting on or before the date and still in force on it.
+        # They are in start order, so a newer version of the same subject
+        # supersedes an older one instead of adding to it.
+        count = bisect_right(starts, date_str)
+        in_force = {}
+        for start, end, slot in self.versions[day_of_week][:count]:
+            if end >= date_str:
+                in_force[slot.subject_id] = slot
+        return list(in_force.values())
+
+_cache = OrderedDict() # studentId -> _PlanIndex
+_lock = threading.Lock()
+
+class PlanResolver:
+    """Resolves which timetable versions (startDate/endDate) apply to which
+    dates. Indexes are cached per student; a cached index is used only
+    while the student's plan version is unchanged, so plan edits handled by
+    other processes are seen on the next read while logged hours don't
+    evict it."""
+
+    @staticmethod
+    def slots_for_dates(student_id, dates, session=None):
+        """{date: [TimetableSlot]} of the slots in force on each date."""
+        index = PlanResolver._get_index(student_id, session)
+        return {
+            date_str: index.slots_on(date_str, datetime.strptime(date_str, '%Y-%m-%d').weekday())
+            for date_str in dates
+        }
+
+    @staticmethod
+    def planned_hours(student_id, dates, session=None):
+        """{subjectId: planned hours} over the given dates, keyed by the
+        stored subject value."""
+        planned = {}
+        for slots in PlanResolver.slots_for_dates(student_id, dates, session).values():
+            for slot in slots:
+                planned[slot.subject_id] = planned.get(slot.subject_id, 0) + float(slot.planned_hours)
+        return planned
+
+    @staticmethod
+    def total_planned(slots, days):
+        """Total planned hours for one student's slots over `days`, a list
+        of (date, dayOfWeek) pairs the caller computes once. For bulk
+        callers that fetched the slots themselves; bypasses the cache."""
+        index = _PlanIndex(slots)
+        return sum(
+            float(slot.planned_hours)
+            for date_str, day_of_week in days
+            for slot in index.slots_on(date_str, day_of_week)
+        )
+
+    @staticmethod
+    def invalidate(student_id):
+        with _lock:
+            _cache.pop(student_id, None)
+
+    @staticmethod
+    def _get_index(student_id, session):
+        # Imported here: the Timetable model invalidates this cache
+        from app.models.timetable import Timetable
+
+        # Read before the slots: a write landing in between leaves the
+        # index with an older version, so it is rebuilt next time
+        version = Timetable.plan_version(student_id, session)
+        with _lock:
+            index = _cache.get(student_id)
+            if index and index.version == version:
+                _cache.move_to_end(student_id)
+                return index
+
+        index = _PlanIndex(Timetable.get_student_timetable(student_id, session), version)
+
+        with _lock:
+            _cache[student_id] = index
+            _cache.move_to_end(student_id)
+            while len(_cache) > current_app.config['PLAN_CACHE_SIZE']:
+                _cache.popitem(last=False)
+        return index
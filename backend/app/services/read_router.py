@@ -0,0 +1,159 @@
+import threading
+from contextlib import contextmanager
+
+from bson import json_util
+from bson.timestamp import Timestamp
+from flask import g, has_request_context, request
+from itsdangerous import BadData, URLSafeTimedSerializer
+from pymongo import monitoring
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from app.extensions import mongo
+
+READ_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+class ReadMetrics(monitoring.CommandListener):
+    """Counts read commands per replica set member ("host:port")."""
+    READS = ('find', 'aggregate', 'count', 'distinct')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def started(self, event):
+        if event.command_name not in self.READS:
+            return
+        member = "%s:%s" % event.connection_id
+        with self._lock:
+            per_member = self.counts.setdefault(member, {})
+            per_member[event.command_name] = per_member.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def snapshot(self):
+        with self._lock:
+            return {member: dict(commands) for member, commands in self.counts.items()}
+
+class ReadRouter:
+    """Routes reads per operation (see Config.READ_ROUTES) and keeps
+    read-your-writes for the client that wrote. The write's cluster and
+    operation time go back to the client in a cookie, so its next read
+    waits for them whichever worker process serves it."""
+    COOKIE = 'causal_token'
+
+    def __init__(self):
+        self.preferences = {}
+
+    def init_app(self, app):
+        max_staleness = app.config['READ_MAX_STALENESS_SECONDS']
+        self.preferences = {}
+        for operation, mode in app.config['READ_ROUTES'].items():
+            pref_class = READ_MODES[mode]
+            self.preferences[operation] = pref_class() if pref_class is Primary else pref_class(max_staleness=max_staleness)
+        # A secondary can't lag more than max staleness, so older writes are
+        # visible everywhere and need no session
+        self.causal_window = max_staleness
+        self.max_tracked = app.config['READ_YOUR_WRITES_MAX_STUDENTS']
+        # Signed: the times end up in the database commands of the reads
+        self.serializer = URLSafeTimedSerializer(app.config['SECRET_KEY'], salt=self.COOKIE, serializer=json_util)
+        app.after_request(self._set_cookie)
+
+    def db(self, operation):
+        return mongo.db.with_options(read_preference=self.preferences.get(operation, Primary()))
+
+    @contextmanager
+    def write_session(self, student_ids):
+        """Causally consistent session for a write; its operation time is
+        handed to the requesting client for every student in `student_ids`."""
+        with mongo.cx.start_session(causal_consistency=True) as session:
+            yield session
+            self.remember(student_ids, self.token(session))
+
+    @contextmanager
+    def read_session(self, student_id):
+        """Session that waits for the client's last write for the student,
+        or None when there is nothing to wait for."""
+        token = self._request_token()
+        if not token or student_id not in token['students']:
+            yield None
+            return
+
+        with mongo.cx.start_session(causal_consistency=True) as session:
+            try:
+                session.advance_cluster_time(token['clusterTime'])
+                session.advance_operation_time(token['operationTime'])
+            except (TypeError, ValueError):
+                session = None
+            yield session
+
+    @staticmethod
+    def token(session):
+        """(clusterTime, operationTime) of the session's last operation;
+        None on standalone servers, whose reads are consistent anyway."""
+        if session is None or not session.cluster_time or not session.operation_time:
+            return None
+        return session.cluster_time, session.operation_time
+
+    def remember(self, student_ids, token):
+        """Send `token` back with the current response. Writes made outside
+        a request (scheduled jobs) have no client to return it to."""
+        if token is None or not student_ids or not has_request_context():
+            return
+        g.causal_students = list(student_ids) + g.get('causal_students', [])
+        g.causal_token = token
+
+    def _request_token(self):
+        token = self._cookie_token()
+        if 'causal_token' not in g:
+            return token
+        # A write earlier in this request: cluster time only moves forward,
+        # so its token covers the client's earlier writes as well
+        cluster_time, operation_time = g.causal_token
+        students = g.causal_students + (token['students'] if token else [])
+        return {
+            "students": list(dict.fromkeys(students))[:self.max_tracked],
+            "clusterTime": cluster_time,
+            "operationTime": operation_time
+        }
+
+    def _cookie_token(self):
+        # Reads outside a request (scheduled jobs) have no client to wait for
+        raw = request.cookies.get(self.COOKIE) if has_request_context() else None
+        if not raw:
+            return None
+        try:
+            token = self.serializer.loads(raw, max_age=self.causal_window)
+            valid = (isinstance(token.get('students'), list)
+                     and isinstance(token.get('clusterTime'), dict)
+                     and isinstance(token['clusterTime'].get('clusterTime'), Timestamp)
+                     and isinstance(token.get('operationTime'), Timestamp))
+        except (BadData, ValueError, TypeError, AttributeError):
+            valid = False
+        # A malformed cookie only costs this client its consistency
+        return token if valid else None
+
+    def _set_cookie(self, response):
+        if 'causal_token' not in g:
+            return response
+        # Expires with the staleness bound, after which secondaries have the write
+        response.set_cookie(
+            self.COOKIE,
+            self.serializer.dumps(self._request_token()),
+            max_age=self.causal_window,
+            httponly=True,
+            samesite='Lax'
+        )
+        return response
+
+read_metrics = ReadMetrics()
+read_router = ReadRouter()
@@ -0,0 +1,89 @@
+import logging
+import time
+from datetime import datetime, timedelta
+
+from app.extensions import scheduler
+from app.models.job import Job
+from app.models.log import DailyLog
+from app.models.timetable import Timetable
+
+class ResetService:
+    # kind -> batch delete function
+    DELETERS = {
+        "logs": DailyLog.delete_batch,
+        "timetable": Timetable.delete_batch
+    }
+    # kind -> step run once everything is deleted
+    FINISHERS = {
+        "logs": DailyLog.finish_reset,
+        "timetable": Timetable.finish_reset
+    }
+
+    @staticmethod
+    def start(kind, student_id):
+        """Queue a reset. It runs in the scheduler process (see
+        run_scheduler.py), which polls for queued jobs; web workers never
+        start a scheduler of their own."""
+        return Job.create(kind, student_id)
+
+    @staticmethod
+    def _submit(app, job_id):
+        # No trigger: run once, right away, on the scheduler's thread pool
+        scheduler.add_job(
+            ResetService._run,
+            args=[app, job_id],
+            id=f"reset-{job_id}",
+            replace_existing=True,
+            misfire_grace_time=None
+        )
+
+    @staticmethod
+    def _run(app, job_id):
+        with app.app_context():
+            job = Job.find(job_id)
+            if not job or job['status'] in ('completed', 'failed'):
+                return
+
+            student_id = job['studentId']
+            delete_batch = ResetService.DELETERS[job['kind']]
+            batch_size = app.config['RESET_BATCH_SIZE']
+            delay = app.config['RESET_BATCH_DELAY']
+
+            try:
+                last_id = job.get('lastId')
+                while True:
+                    deleted, last_id = delete_batch(student_id, last_id, batch_size)
+                    if last_id is None:
+                        break
+                    Job.record_progress(job_id, last_id, deleted)
+                    time.sleep(delay)
+
+                ResetService.FINISHERS[job['kind']](student_id)
+                Job.mark_completed(job_id)
+            except Exception as e:
+                logging.error("Reset job %s failed: %s", job_id, str(e))
+                Job.mark_failed(job_id, str(e))
+
+    @staticmethod
+    def schedule(app):
+        scheduler.add_job(
+            ResetService._claim_jobs,
+            'interval',
+            args=[app],
+            seconds=app.config['RESET_POLL_SECONDS'],
+            id='run_reset_jobs',
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _claim_jobs(app):
+        # Queued jobs, and unfinished ones whose process died midway
+        with app.app_context():
+            stale_before = datetime.utcnow() - timedelta(seconds=app.config['RESET_JOB_STALE_SECONDS'])
+            while True:
+                job = Job.claim(stale_before)
+                if not job:
+                    break
+                if job['status'] != 'pending' or job.get('claimedAt'):
+                    logging.info("Resuming reset job %s", job['_id'])
+                ResetService._submit(app, str(job['_id']))
@@ -0,0 +1,192 @@
+import glob
+import gzip
+import hashlib
+import logging
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from bson import json_util
+from flask import current_app
+
+from app.extensions import mongo, scheduler
+from app.models.lease import Lease
+from app.models.log_summary import LogSummary
+
+class RetentionService:
+    @staticmethod
+    def hot_boundary(today=None):
+        """First date (YYYY-MM-DD) whose raw logs are still in daily_logs.
+
+        The boundary is aligned to the start of a month so that a summary
+        document always covers a whole month of archived logs.
+        """
+        today = today or datetime.now()
+        cutoff = today - timedelta(days=current_app.config['LOG_RETENTION_DAYS'])
+        return cutoff.replace(day=1).strftime('%Y-%m-%d')
+
+    @staticmethod
+    def compact_logs(today=None):
+        boundary = RetentionService.hot_boundary(today)
+        archive_dir = current_app.config['LOG_ARCHIVE_DIR']
+        lease_seconds = current_app.config['LOG_COMPACTION_LEASE_SECONDS']
+
+        # Every process with the scheduler fires this job; one of them runs it
+        owner = Lease.owner()
+        if not Lease.acquire('compact_logs', owner, lease_seconds):
+            logging.info("Log retention: another process is compacting, skipping")
+            return 0
+
+        try:
+            RetentionService._fold_pending()
+            groups = mongo.db.daily_logs.aggregate([
+                {"$match": {"date": {"$lt": boundary}}},
+                {"$group": {"_id": {
+                    "studentId": "$studentId",
+                    "month": {"$substrBytes": ["$date", 0, 7]}
+                }}}
+            ], allowDiskUse=True)
+
+            archived = 0
+            for group in groups:
+                try:
+                    archived += RetentionService._compact_month(
+                        group['_id']['studentId'], group['_id']['month'], archive_dir
+                    )
+                except ValueError as e:
+                    # Left in daily_logs rather than archived elsewhere
+                    logging.warning("Log retention: skipping %s: %s", group['_id'], str(e))
+                if not Lease.acquire('compact_logs', owner, lease_seconds):
+                    logging.warning("Log retention: lost the compaction lease, stopping")
+                    break
+            logging.info("Log retention: archived %d logs older than %s", archived, boundary)
+            return archived
+        finally:
+            Lease.release('compact_logs', owner)
+
+    @staticmethod
+    def _compact_month(student_id, month, archive_dir):
+        logs = list(mongo.db.daily_logs.find({
+            "studentId": student_id,
+            "date": {"$gte": f"{month}-01", "$lte": f"{month}-31"}
+        }).sort("_id", 1))
+        if not logs:
+            return 0
+
+        # The batch id is derived from the archived _ids, so a re-run after
+        # a crash writes the same file and is recognised by the summaries
+        ids = [log['_id'] for log in logs]
+        batch_id = hashlib.sha1(b"".join(i.binary for i in ids)).hexdigest()[:16]
+
+        # 1. Archive raw entries
+        RetentionService._check_archive_id(student_id)
+        month_dir = os.path.join(archive_dir, month)
+        os.makedirs(month_dir, exist_ok=True)
+        path = os.path.join(month_dir, f"{student_id}-{batch_id}.ndjson.gz")
+        # Temp file private to this process; the rename is atomic, so a
+        # concurrent run can at worst replace it with identical content
+        fd, tmp_path = tempfile.mkstemp(dir=month_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+                for log in logs:
+                    f.write(json_util.dumps(log))
+                    f.write("\n")
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        # 2. Drop them from the hot collection, with a pending record first
+        # so a crash before step 3 is finished by the next run. Readers add
+        # raw logs and summaries together: folding before the delete would
+        # count the month twice in between, this way it is briefly missing.
+        mongo.db.log_archive_batches.replace_one(
+            {"_id": batch_id},
+            {"studentId": student_id, "month": month, "path": path, "createdAt": datetime.utcnow()},
+            upsert=True
+        )
+        result = mongo.db.daily_logs.delete_many({"_id": {"$in": ids}})
+
+        # 3. Roll up into per-subject summaries
+        RetentionService._fold(student_id, month, batch_id, logs)
+        return result.deleted_count
+
+    @staticmethod
+    def _fold(student_id, month, batch_id, logs):
+        per_subject = {} # {subjectId: ({date: hours}, count)}
+        for log in logs:
+            hours_by_day, count = per_subject.get(log.get('subjectId'), ({}, 0))
+            hours_by_day[log['date']] = hours_by_day.get(log['date'], 0) + float(log.get('hoursSpent', 0))
+            per_subject[log.get('subjectId')] = (hours_by_day, count + 1)
+
+        # add_batch counts each subject at most once, so re-folding a batch
+        # that was partly folded is safe
+        for subject_id, (hours_by_day, count) in per_subject.items():
+            LogSummary.add_batch(student_id, subject_id, month, batch_id, hours_by_day, count)
+        mongo.db.log_archive_batches.delete_one({"_id": batch_id})
+
+    @staticmethod
+    def _fold_pending():
+        """Fold batches archived and deleted by a run that stopped before
+        folding them, reading them back from their archive file."""
+        folded = 0
+        for batch in list(mongo.db.log_archive_batches.find()):
+            try:
+                with gzip.open(batch['path'], 'rt', encoding='utf-8') as f:
+                    logs = [json_util.loads(line) for line in f if line.strip()]
+            except FileNotFoundError:
+                # Archive removed since, e.g. by a reset of the student's logs
+                mongo.db.log_archive_batches.delete_one({"_id": batch['_id']})
+                continue
+            RetentionService._fold(batch['studentId'], batch['month'], batch['_id'], logs)
+            folded += 1
+        if folded:
+            logging.warning("Log retention: folded %d batches left by an interrupted run", folded)
+        return folded
+
+    @staticmethod
+    def delete_archives(student_id):
+        """Remove the student's archive files, e.g. when their logs are
+        reset. Returns the number of files removed."""
+        RetentionService._check_archive_id(student_id)
+        # Batches not yet folded must not be folded back in after the reset
+        mongo.db.log_archive_batches.delete_many({"studentId": student_id})
+        pattern = os.path.join(
+            current_app.config['LOG_ARCHIVE_DIR'], '*', f"{glob.escape(student_id)}-*.ndjson.gz"
+        )
+        removed = 0
+        for path in glob.glob(pattern):
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    @staticmethod
+    def valid_archive_id(student_id):
+        """Whether a student id can be part of an archive file name: ids
+        come from requests and must not reach outside LOG_ARCHIVE_DIR."""
+        return (isinstance(student_id, str) and student_id not in ("", ".", "..")
+                and not any(c in student_id for c in ("/", "\\", "\0")))
+
+    @staticmethod
+    def _check_archive_id(student_id):
+        if not RetentionService.valid_archive_id(student_id):
+            raise ValueError(f"Invalid student id for an archive path: {student_id!r}")
+
+    @staticmethod
+    def schedule(app):
+        scheduler.add_job(
+            RetentionService._run_scheduled,
+            'cron',
+            args=[app],
+            hour=3,
+            id='compact_logs',
+            replace_existing=True
+        )
+
+    @staticmethod
+    def _run_scheduled(app):
+        with app.app_context():
+            RetentionService.compact_logs()
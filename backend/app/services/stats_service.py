@@ -1,5 +1,11 @@
-from app.extensions import mongo
+from app.models.log import DailyLog
+from app.models.log_summary import LogSummary
+from app.models.subject import SubjectCatalog
+from app.services.plan_resolver import PlanResolver
+from app.services.read_router import read_router
+from app.services.retention_service import RetentionService
 from datetime import datetime, timedelta
+from itertools import chain
 
 class StatsService:
     @staticmethod
@@ -21,53 +27,56 @@ class StatsService:
         if period == 'daily':
             # Just specific day
             target_dates = [today.strftime('%Y-%m-%d')]
-            # For timetable, we only care about that day's day of week
-            target_days_of_week = [today.weekday()]
         else:
             # Default to Weekly (Monday to Sunday)
             start_of_week = today - timedelta(days=today.weekday())
             target_dates = [(start_of_week + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(7)]
-            target_days_of_week = list(range(7)) # All days
 
-        # Fetch Logs for the period
-        logs_cursor = mongo.db.daily_logs.find({
-            "studentId": student_id,
-            "date": {"$in": target_dates}
-        })
-        
-        # Fetch Timetable (Plan)
-        # Filter by relevant days of week if daily (optimization, though fetching all is fine too)
-        timetable_query = {"studentId": student_id}
-        if period == 'daily':
-            timetable_query["dayOfWeek"] = target_days_of_week[0]
+        with read_router.read_session(student_id) as session:
+            # Fetch Logs for the period
+            logs_cursor = DailyLog.get_by_dates(student_id, target_dates, session, operation='stats')
+
+            # Days before the retention boundary only survive as monthly summaries
+            if target_dates[0] < RetentionService.hot_boundary():
+                logs_cursor = chain(logs_cursor, LogSummary.get_daily_hours(student_id, target_dates, session))
 
-        timetable_cursor = mongo.db.timetables.find(timetable_query)
+            # Planned hours from the timetable versions in force on each date
+            planned_by_subject = PlanResolver.planned_hours(student_id, target_dates, session)
 
         # Aggregate Data
         subject_stats = {} # {subjectId: {actual: 0, planned: 0}}
         
         # 1. Process Planned Hours from Timetable
-        for slot in timetable_cursor:
-            subj = slot.get('subjectId')
-            planned = float(slot.get('plannedHours', 0))
+        for subj, planned in planned_by_subject.items():
             if subj not in subject_stats:
                 subject_stats[subj] = {'actual': 0, 'planned': 0}
             subject_stats[subj]['planned'] += planned
 
         # 2. Process Actual Hours from Logs
         for log in logs_cursor:
-            subj = log.get('subjectId')
-            actual = float(log.get('hoursSpent', 0))
+            subj = log.subject_id
+            actual = float(log.hours_spent)
             if subj not in subject_stats:
                 subject_stats[subj] = {'actual': 0, 'planned': 0}
             subject_stats[subj]['actual'] += actual
 
+        # Grouping above is on compact subject keys; decode once per group.
+        # Legacy documents still holding the name fold into the same entry.
+        named_stats = {}
+        for subj, data in subject_stats.items():
+            name = SubjectCatalog.get_name(student_id, subj)
+            if name in named_stats:
+                named_stats[name]['actual'] += data['actual']
+                named_stats[name]['planned'] += data['planned']
+            else:
+                named_stats[name] = data
+
         # Format Response
         total_hours = 0
         total_planned = 0
         breakdown = []
 
-        for subj, data in subject_stats.items():
+        for subj, data in named_stats.items():
             total_hours += data['actual']
             total_planned += data['planned']
             breakdown.append({
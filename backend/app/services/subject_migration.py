@@ -0,0 +1,47 @@
+import logging
+import time
+
+from pymongo import UpdateOne
+
+from app.extensions import mongo
+from app.models.subject import SubjectCatalog
+
+# Collections whose subjectId moves from the name to the catalog key
+COLLECTIONS = ("daily_logs", "timetables", "daily_log_summaries")
+
+class SubjectMigration:
+    @staticmethod
+    def run(batch_size=500, delay=0.05):
+        """Rewrite legacy subject names to catalog keys, in _id order and in
+        batches, while the app keeps serving traffic. Safe to re-run."""
+        migrated = {}
+        for collection in COLLECTIONS:
+            migrated[collection] = SubjectMigration._migrate_collection(collection, batch_size, delay)
+            logging.info("Subject keys: migrated %d %s documents", migrated[collection], collection)
+        return migrated
+
+    @staticmethod
+    def _migrate_collection(collection, batch_size, delay):
+        coll = mongo.db[collection]
+        total = 0
+        last_id = None
+        while True:
+            query = {"subjectId": {"$type": "string"}}
+            if last_id:
+                query["_id"] = {"$gt": last_id}
+            docs = list(coll.find(query, {"studentId": 1, "subjectId": 1}).sort("_id", 1).limit(batch_size))
+            if not docs:
+                return total
+
+            # Only rewrite documents whose name is unchanged since we read them
+            ops = [
+                UpdateOne(
+                    {"_id": doc['_id'], "subjectId": doc['subjectId']},
+                    {"$set": {"subjectId": SubjectCatalog.get_key(doc['studentId'], doc['subjectId'])}}
+                )
+                for doc in docs
+            ]
+            result = coll.bulk_write(ops, ordered=False)
+            total += result.modified_count
+            last_id = docs[-1]['_id']
+            time.sleep(delay)
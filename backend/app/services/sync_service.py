@@ -0,0 +1,89 @@
+import base64
+from datetime import datetime, timedelta
+
+from flask import current_app
+from pymongo import ASCENDING
+
+from app.extensions import mongo
+from app.models.records import LogEntry, TaskRecord, TimetableSlot
+from app.models.subject import SubjectCatalog
+from app.models.tombstone import Tombstone
+
+class SyncService:
+    _indexed = False
+
+    @staticmethod
+    def encode_cursor(moment):
+        millis = int((moment - datetime(1970, 1, 1)).total_seconds() * 1000)
+        return base64.urlsafe_b64encode(str(millis).encode()).decode().rstrip('=')
+
+    @staticmethod
+    def decode_cursor(token):
+        """Datetime for a cursor token; raises ValueError if malformed."""
+        padded = token + '=' * (-len(token) % 4)
+        millis = int(base64.urlsafe_b64decode(padded.encode()).decode())
+        try:
+            return datetime(1970, 1, 1) + timedelta(milliseconds=millis)
+        except OverflowError:
+            raise ValueError(f"Sync cursor out of range: {millis}")
+
+    @staticmethod
+    def changes_since(student_id, since=None):
+        """Documents changed after `since` (all of them when None) plus the
+        tombstones recorded since, keyed like the response body. Clients
+        apply `resets` first, then `deleted`, then the upserts."""
+        SyncService._ensure_indexes()
+        config = current_app.config
+        now = datetime.utcnow()
+
+        # Tombstones older than the TTL are gone, so such cursors resync fully
+        horizon = now - timedelta(days=config['SYNC_TOMBSTONE_TTL_DAYS'])
+        full = since is None or since < horizon
+
+        query = {"studentId": student_id}
+        if not full:
+            query["updatedAt"] = {"$gt": since}
+
+        changes = {}
+        logs = [LogEntry.from_doc(doc) for doc in mongo.db.daily_logs.find(query, LogEntry.PROJECTION)]
+        if logs:
+            changes["logs"] = [log.to_dict(SubjectCatalog.get_name(student_id, log.subject_id)) for log in logs]
+
+        slots = [TimetableSlot(doc) for doc in mongo.db.timetables.find(query, TimetableSlot.PROJECTION)]
+        if slots:
+            changes["timetable"] = [slot.to_dict(SubjectCatalog.get_name(student_id, slot.subject_id)) for slot in slots]
+
+        tasks = [TaskRecord(doc) for doc in mongo.db.daily_tasks.find(query, TaskRecord.PROJECTION)]
+        if tasks:
+            changes["tasks"] = [task.to_dict() for task in tasks]
+
+        if full:
+            changes["full"] = True
+        else:
+            tombstones = Tombstone.get_since(student_id, since)
+            resets = sorted({t['collection'] for t in tombstones if t['kind'] == 'reset'})
+            deleted = [{"collection": t['collection'], "_id": t['docId']} for t in tombstones if t['kind'] == 'delete']
+            if resets:
+                changes["resets"] = resets
+            if deleted:
+                changes["deleted"] = deleted
+
+        # Trail the clock so writes committed during this read are re-sent
+        cursor = now - timedelta(seconds=config['SYNC_CLOCK_SKEW_SECONDS'])
+        if since and since > cursor:
+            cursor = since
+        changes["cursor"] = SyncService.encode_cursor(cursor)
+        return changes
+
+    @staticmethod
+    def _ensure_indexes():
+        if SyncService._indexed:
+            return
+        for collection in ("daily_logs", "timetables", "daily_tasks", "tombstones"):
+            mongo.db[collection].create_index([("studentId", ASCENDING), ("updatedAt", ASCENDING)])
+        mongo.db.tombstones.create_index(
+            "updatedAt",
+            name="tombstone_ttl",
+            expireAfterSeconds=current_app.config['SYNC_TOMBSTONE_TTL_DAYS'] * 86400
+        )
+        SyncService._indexed = True
@@ -0,0 +1,92 @@
+"""Weekly leaderboard cost with many students.
+
+Seeds synthetic students with a week of logs and a timetable, then times:
+per-student StatsService calls (a sample, extrapolated to every student),
+the first refresh (totals rebuilt from the logs with one aggregation), an
+incremental refresh after new logs, and reading the stored board.
+
+Usage: python bench_leaderboard.py [students] [sample]
+"""
+import sys
+import time
+import uuid
+
+from app import create_app
+from app.extensions import mongo
+from app.models.log import DailyLog
+from app.models.weekly_total import WeeklyTotal
+from app.services.leaderboard_service import LeaderboardService
+from app.services.stats_service import StatsService
+
+STUDENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+SAMPLE = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+WEEK = "2001-01-01" # a Monday no real data falls in
+BATCH = 10000
+
+app = create_app()
+prefix = "bench_board_" + str(uuid.uuid4())[:8]
+dates = WeeklyTotal.week_dates(WEEK)
+
+def student(i):
+    return f"{prefix}_{i}"
+
+def seed():
+    logs, slots = [], []
+    for i in range(STUDENTS):
+        for day in range(i % 4, 7, 2):
+            logs.append({"studentId": student(i), "subjectId": 1, "date": dates[day], "hoursSpent": (i % 13) / 4})
+        for day in (0, 2, 4):
+            slots.append({
+                "studentId": student(i), "subjectId": 1, "dayOfWeek": day, "plannedHours": 1 + i % 3,
+                "actualHours": 0, "startDate": dates[0], "endDate": dates[-1]
+            })
+        if len(logs) >= BATCH:
+            mongo.db.daily_logs.insert_many(logs)
+            logs = []
+        if len(slots) >= BATCH:
+            mongo.db.timetables.insert_many(slots)
+            slots = []
+    if logs:
+        mongo.db.daily_logs.insert_many(logs)
+    if slots:
+        mongo.db.timetables.insert_many(slots)
+
+def timed(label, fn, per=None):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<36} {elapsed * 1000:10.1f} ms" + (f"  ({per})" if per else ""))
+    return result, elapsed
+
+def cleanup():
+    for collection in ("daily_logs", "timetables", "weekly_totals", "subjects"):
+        mongo.db[collection].delete_many({"studentId": {"$regex": f"^{prefix}"}})
+    mongo.db.subject_counters.delete_many({"_id": {"$regex": f"^{prefix}"}})
+    mongo.db.leaderboards.delete_many({"week": WEEK})
+    mongo.db.leaderboard_requests.delete_many({"_id": WEEK})
+
+with app.app_context():
+    try:
+        print(f"{STUDENTS} students, week of {WEEK}")
+        timed("seed", seed)
+
+        _, sample = timed(f"calculate_stats x {SAMPLE}",
+                          lambda: [StatsService.calculate_stats(student(i), 'weekly', WEEK) for i in range(SAMPLE)])
+        print(f"  {'-> extrapolated to all students':<36} {sample / SAMPLE * STUDENTS * 1000:10.1f} ms")
+
+        board, _ = timed("refresh (rebuild from logs)", lambda: LeaderboardService.refresh(WEEK, rebuild=True))
+
+        for i in range(0, STUDENTS, max(STUDENTS // 1000, 1)):
+            DailyLog.create(student(i), "Math", dates[3], 0.5, "")
+        timed("refresh (from weekly_totals)", lambda: LeaderboardService.refresh(WEEK))
+
+        reads = 1000
+        timed(f"get_board x {reads}", lambda: [LeaderboardService.get_board(WEEK) for _ in range(reads)],
+              per="stored board, O(k)")
+        timed(f"student_standing x {SAMPLE}",
+              lambda: [LeaderboardService.student_standing(student(i), WEEK) for i in range(SAMPLE)])
+
+        top = board['byHours'][0]
+        print(f"  ranked {board['students']} students; top by hours {top['studentId']} ({top['hours']} h)")
+    finally:
+        cleanup()
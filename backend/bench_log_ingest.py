@@ -0,0 +1,84 @@
+"""Compare the direct DailyLog.create path with the buffered (group-commit)
+path for study-timer ticks.
+
+With 'flushed' durability every client waits for the next flush, so
+buffered throughput is bounded by clients / LOG_BUFFER_WINDOW_MS; the
+database write count is what the buffer actually saves.
+
+Clients are threads in this process, so this measures the buffer, not the
+server: behind gunicorn every waiting request holds a connection of a
+worker, which is why the image runs gevent workers.
+
+Usage: python bench_log_ingest.py [ticks] [clients]
+"""
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from pymongo import monitoring
+
+from app import create_app
+from app.extensions import mongo
+from app.models.log import DailyLog
+from app.services.log_buffer import log_buffer
+
+TICKS = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+STUDENTS = 100
+SUBJECTS = ["Math", "Physics", "Chemistry"]
+
+class WriteCounter(monitoring.CommandListener):
+    WRITES = ('insert', 'update', 'delete')
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        if event.command_name in self.WRITES:
+            self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+counter = WriteCounter()
+# Listeners must be registered before the client is created
+monitoring.register(counter)
+
+app = create_app()
+prefix = "bench_ingest_" + str(uuid.uuid4())[:8]
+today = datetime.now().strftime('%Y-%m-%d')
+tick_hours = 1 / 60.0
+
+def ticks():
+    for i in range(TICKS):
+        yield (f"{prefix}_{i % STUDENTS}", SUBJECTS[i % len(SUBJECTS)])
+
+def run(label, write_one):
+    counter.count = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        results = list(pool.map(lambda t: write_one(*t), ticks()))
+    log_buffer.flush()
+    elapsed = time.perf_counter() - start
+    writes = counter.count
+    failed = sum(1 for r in results if r is False)
+    docs = mongo.db.daily_logs.count_documents({"studentId": {"$regex": f"^{prefix}"}})
+    mongo.db.daily_logs.delete_many({"studentId": {"$regex": f"^{prefix}"}})
+    print(f"{label:<20} {TICKS / elapsed:10.0f} ticks/s  {writes:7d} db writes  "
+          f"{docs:6d} log docs  ({elapsed:.2f}s, {failed} failed)")
+
+with app.app_context():
+    print(f"{TICKS} ticks from {CLIENTS} concurrent clients, {STUDENTS} students")
+
+    run("direct", lambda student, subject: DailyLog.create(student, subject, today, tick_hours, ""))
+
+    for durability in ("flushed", "accepted"):
+        log_buffer.durability = durability
+        run(f"buffered/{durability}", lambda student, subject: log_buffer.add(student, subject, today, tick_hours))
+
+    log_buffer.stop()
@@ -0,0 +1,73 @@
+"""Memory and wire-size microbenchmark for the lean read models.
+
+Compares 10k rows decoded as full documents (what the routes used to fetch)
+with projected documents decoded into the __slots__ records from
+app.models.records. Runs without a database: rows are BSON-encoded and
+decoded locally the same way the driver does.
+
+Usage: python bench_read_models.py [rows]
+"""
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import bson
+from bson.objectid import ObjectId
+
+from app.models.records import LogEntry, TimetableSlot
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+def log_doc(i):
+    return {
+        "_id": ObjectId(),
+        "studentId": "65a1f0c2e4b0a1b2c3d4e5f6",
+        "subjectId": i % 6 + 1,
+        "date": f"2024-01-{i % 28 + 1:02d}",
+        "hoursSpent": 1.5,
+        "notes": "Worked through chapter exercises and reviewed mistakes",
+        "createdAt": datetime(2024, 1, 1)
+    }
+
+def slot_doc(i):
+    return {
+        "_id": ObjectId(),
+        "studentId": "65a1f0c2e4b0a1b2c3d4e5f6",
+        "subjectId": i % 6 + 1,
+        "dayOfWeek": i % 7,
+        "plannedHours": 2,
+        "actualHours": 1.5,
+        "startDate": "2024-01-01",
+        "endDate": "2024-06-30"
+    }
+
+def project(doc, projection):
+    return {k: v for k, v in doc.items() if k == '_id' or k in projection}
+
+def measure(label, payload, decode):
+    # Bytes on the wire, decode time, then peak and retained memory
+    # (traced separately, tracemalloc slows allocation down)
+    wire = sum(len(raw) for raw in payload)
+    start = time.perf_counter()
+    decode(payload)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    rows = decode(payload)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<22} wire {wire / ROWS:6.1f} B/row  retained {retained / ROWS:6.1f} B/row  "
+          f"peak {peak / ROWS:6.1f} B/row  decode {elapsed * 1000:6.1f} ms")
+    return rows
+
+def run(name, make_doc, record_type, to_record):
+    docs = [make_doc(i) for i in range(ROWS)]
+    full = [bson.encode(doc) for doc in docs]
+    projected = [bson.encode(project(doc, record_type.PROJECTION)) for doc in docs]
+
+    print(f"{name} ({ROWS} rows)")
+    measure("full documents", full, lambda raw: [bson.decode(r) for r in raw])
+    measure("projected records", projected, lambda raw: [to_record(bson.decode(r)) for r in raw])
+
+run("daily_logs", log_doc, LogEntry, LogEntry.from_doc)
+run("timetables", slot_doc, TimetableSlot, TimetableSlot)
@@ -0,0 +1,58 @@
+"""Storage comparison of subject names vs compact catalog keys.
+
+Builds two scratch copies of a daily_logs-shaped collection, one storing
+subject names and one storing integer keys, with the same
+(studentId, subjectId, date) index, and prints data and index sizes.
+
+Usage: python bench_subject_keys.py [documents]
+"""
+import sys
+import uuid
+from datetime import datetime, timedelta
+
+from app import create_app
+from app.extensions import mongo
+
+DOCUMENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+STUDENTS = 1000
+SUBJECTS = ["Mathematics", "Physics", "Chemistry", "Biology", "English Literature", "Computer Science"]
+
+app = create_app()
+suffix = str(uuid.uuid4())[:8]
+start = datetime(2024, 1, 1)
+
+def make_docs(subject_value):
+    for i in range(DOCUMENTS):
+        subject = i % len(SUBJECTS)
+        yield {
+            "studentId": f"{i % STUDENTS:024x}",
+            "subjectId": subject_value(subject),
+            "date": (start + timedelta(days=i % 365)).strftime('%Y-%m-%d'),
+            "hoursSpent": 1.5,
+            "notes": "",
+            "createdAt": start
+        }
+
+def build(name, subject_value):
+    coll = mongo.db[name]
+    batch = []
+    for doc in make_docs(subject_value):
+        batch.append(doc)
+        if len(batch) == 10000:
+            coll.insert_many(batch)
+            batch = []
+    if batch:
+        coll.insert_many(batch)
+    coll.create_index([("studentId", 1), ("subjectId", 1), ("date", 1)])
+    stats = mongo.db.command("collStats", name)
+    coll.drop()
+    return stats
+
+with app.app_context():
+    print(f"{DOCUMENTS} documents, {STUDENTS} students, {len(SUBJECTS)} subjects")
+    names = build(f"bench_subject_names_{suffix}", lambda i: SUBJECTS[i])
+    keys = build(f"bench_subject_keys_{suffix}", lambda i: i + 1)
+
+    for label, field in (("avg document", "avgObjSize"), ("data size", "size"), ("index size", "totalIndexSize")):
+        before, after = names[field], keys[field]
+        print(f"{label:<14} names={before:>12,} B  keys={after:>12,} B  ({100.0 * (before - after) / before:5.1f}% smaller)")
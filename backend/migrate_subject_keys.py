@@ -0,0 +1,18 @@
+"""Online migration of subject names to compact catalog keys.
+
+Usage: python migrate_subject_keys.py [batch_size] [delay_seconds]
+"""
+import sys
+
+from app import create_app
+from app.services.subject_migration import SubjectMigration
+
+batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+
+app = create_app()
+
+with app.app_context():
+    migrated = SubjectMigration.run(batch_size, delay)
+    for collection, count in migrated.items():
+        print(f"{collection}: {count} documents migrated")
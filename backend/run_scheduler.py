@@ -0,0 +1,29 @@
+"""Runs the background jobs (log retention, queued log and timetable
+resets, leaderboard refreshes) in a process of their own.
+
+The web server runs several workers, each with its own copy of the app;
+they start without SCHEDULER_ENABLED so each job fires once per interval
+instead of once per worker. Run exactly one of these next to them.
+
+Usage: SCHEDULER_ENABLED=true python run_scheduler.py
+"""
+import signal
+import sys
+import threading
+
+from app import create_app
+from app.extensions import scheduler
+
+app = create_app()
+if not app.config['SCHEDULER_ENABLED']:
+    sys.exit("SCHEDULER_ENABLED is not set, no jobs were scheduled")
+
+stopping = threading.Event()
+signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+try:
+    while not stopping.wait(1):
+        pass
+except KeyboardInterrupt:
+    pass
+finally:
+    scheduler.shutdown()
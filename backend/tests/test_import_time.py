@@ -0,0 +1,63 @@
+"""Import-time budget for the app factory.
+
+Runs `python -X importtime` on `create_app()` in a fresh interpreter and
+checks that the total import time stays within IMPORT_BUDGET_MS (default
+300, raise it on slow CI), that lazily loaded dependencies (Twilio,
+APScheduler) stay unloaded and that create_app() starts no background
+thread.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_MS = float(os.environ.get('IMPORT_BUDGET_MS', 300))
+LAZY_MODULES = ('twilio', 'apscheduler')
+
+PROBE = (
+    "import threading\n"
+    "from app import create_app\n"
+    "create_app()\n"
+    "print(threading.active_count())\n"
+)
+
+@pytest.fixture(scope='module')
+def cold_start():
+    env = dict(os.environ)
+    env.pop('SCHEDULER_ENABLED', None)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stderr
+
+    # Lines look like: "import time:       self [us] |  cumulative | imported package"
+    total_us = 0
+    imported = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        total_us += int(self_us)
+        imported.append(name.strip())
+
+    threads = int(result.stdout.strip().splitlines()[-1])
+    return total_us / 1000.0, imported, threads
+
+def test_import_time_within_budget(cold_start):
+    total_ms, imported, _ = cold_start
+    assert total_ms <= BUDGET_MS, f"{len(imported)} modules took {total_ms:.1f} ms (budget {BUDGET_MS:.0f} ms)"
+
+def test_lazy_dependencies_not_imported(cold_start):
+    _, imported, _ = cold_start
+    eager = sorted({module for module in imported if module.split('.')[0] in LAZY_MODULES})
+    assert not eager, f"imported at startup: {', '.join(eager)}"
+
+def test_no_background_threads(cold_start):
+    _, _, threads = cold_start
+    assert threads == 1, f"create_app() left {threads - 1} background thread(s) running"
@@ -0,0 +1,89 @@
+import pytest
+
+from app import create_app
+from app.services.leaderboard_service import LeaderboardService
+
+@pytest.fixture(autouse=True)
+def names(monkeypatch):
+    monkeypatch.setattr(LeaderboardService, '_names',
+                        staticmethod(lambda student_ids: {student_id: student_id.upper() for student_id in student_ids}))
+
+def test_cutoffs_of_no_scores():
+    assert LeaderboardService._cutoffs([]) == []
+
+def test_cutoffs_use_nearest_rank():
+    cutoffs = LeaderboardService._cutoffs([1, 2, 3, 4])
+    assert len(cutoffs) == 101
+    assert cutoffs[0] == 1
+    assert cutoffs[25] == 1
+    assert cutoffs[26] == 2
+    assert cutoffs[50] == 2
+    assert cutoffs[75] == 3
+    assert cutoffs[76] == 4
+    assert cutoffs[100] == 4
+
+def test_cutoffs_of_one_score():
+    assert LeaderboardService._cutoffs([7.5]) == [7.5] * 101
+
+def test_percentile_without_board_or_score():
+    assert LeaderboardService._percentile([], 3) is None
+    assert LeaderboardService._percentile([1] * 101, None) is None
+
+def test_percentile_is_share_at_or_below():
+    cutoffs = LeaderboardService._cutoffs([1, 2, 3, 4])
+    assert LeaderboardService._percentile(cutoffs, 4) == 100
+    assert LeaderboardService._percentile(cutoffs, 3) == 75
+    assert LeaderboardService._percentile(cutoffs, 2.5) == 50
+    assert LeaderboardService._percentile(cutoffs, 1) == 25
+    # Below everyone on the board
+    assert LeaderboardService._percentile(cutoffs, 0) == 0
+
+def test_percentile_with_ties():
+    cutoffs = LeaderboardService._cutoffs([0, 0, 0, 5])
+    assert LeaderboardService._percentile(cutoffs, 0) == 75
+    assert LeaderboardService._percentile(cutoffs, 5) == 100
+
+def test_rank_orders_by_hours_and_adherence():
+    board = LeaderboardService._rank(
+        hours={"a": 6, "b": 3, "c": 9},
+        planned={"a": 4, "b": 2},
+        k=10
+    )
+    assert board['students'] == 3
+    assert [(e['rank'], e['studentId'], e['hours']) for e in board['byHours']] == [(1, "c", 9), (2, "a", 6), (3, "b", 3)]
+    # c has no plan, so no adherence; a and b tie on it
+    assert [(e['studentId'], e['adherence']) for e in board['byAdherence']] == [("b", 1.5), ("a", 1.5)]
+    assert board['byHours'][0]['name'] == "C"
+    assert board['byHours'][0]['plannedHours'] == 0
+    assert board['byHours'][0]['adherence'] is None
+
+def test_rank_ties_break_on_student_id():
+    board = LeaderboardService._rank(hours={"a": 2, "b": 2, "c": 2}, planned={}, k=10)
+    assert [e['studentId'] for e in board['byHours']] == ["c", "b", "a"]
+
+def test_rank_keeps_top_k_but_cutoffs_cover_everyone():
+    hours = {f"s{i:02d}": i for i in range(1, 21)}
+    board = LeaderboardService._rank(hours, planned={}, k=3)
+    assert [e['studentId'] for e in board['byHours']] == ["s20", "s19", "s18"]
+    assert board['students'] == 20
+    assert board['hoursCutoffs'][0] == 1
+    assert board['hoursCutoffs'][100] == 20
+    assert board['byAdherence'] == []
+    assert board['adherenceCutoffs'] == []
+
+def test_rank_includes_planned_students_without_hours():
+    board = LeaderboardService._rank(hours={"a": 0}, planned={"b": 2, "c": 0}, k=10)
+    assert board['students'] == 1
+    assert [(e['studentId'], e['hours'], e['adherence']) for e in board['byAdherence']] == [("b", 0, 0.0)]
+
+def test_in_range_spans_history_up_to_current_week(monkeypatch):
+    app = create_app()
+    app.config['LEADERBOARD_HISTORY_WEEKS'] = 2
+    monkeypatch.setattr(LeaderboardService, 'current_week', staticmethod(lambda: "2024-03-18"))
+    with app.app_context():
+        assert LeaderboardService.in_range("2024-03-18")
+        assert LeaderboardService.in_range("2024-03-04")
+        assert not LeaderboardService.in_range("2024-02-26")
+        assert not LeaderboardService.in_range("2024-03-25")
+        assert not LeaderboardService.in_range("0001-01-01")
+        assert not LeaderboardService.in_range("9999-12-27")
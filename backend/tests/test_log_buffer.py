@@ -0,0 +1,155 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from app import create_app
+from app.extensions import mongo
+from app.models.subject import SubjectCatalog
+from app.services import log_buffer as log_buffer_module
+from app.services.log_buffer import LogBuffer
+from app.services.read_router import read_router
+
+DATE = "2024-01-01"
+
+class FakeCollection:
+    """Records bulk writes; `fail(ops)` may raise to simulate errors.
+    Applied log upserts are kept so the buffer can read them back."""
+
+    def __init__(self):
+        self.writes = []
+        self.applied = []
+        self.fail = None
+
+    def with_options(self, **kwargs):
+        return self
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def bulk_write(self, ops, ordered=True, session=None):
+        if self.fail:
+            self.fail(self, ops)
+        self.apply(ops)
+
+    def apply(self, ops):
+        self.writes.append(ops)
+        for op in ops:
+            self.applied.append(dict(op._filter, **op._doc.get("$set", {})))
+
+    def find(self, query, projection=None, session=None):
+        students = query["studentId"]["$in"]
+        return [doc for doc in self.applied
+                if doc["studentId"] in students and doc.get("lastFlush") == query["lastFlush"]]
+
+class FakeDB:
+    def __init__(self):
+        self.daily_logs = FakeCollection()
+        self.timetables = FakeCollection()
+        self.weekly_totals = FakeCollection()
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config["LOG_BUFFER_DURABILITY"] = "flushed"
+    return app
+
+@pytest.fixture
+def db(app, monkeypatch):
+    # Patched after create_app, which sets up the real client
+    db = FakeDB()
+    monkeypatch.setattr(mongo, "db", db)
+    monkeypatch.setattr(SubjectCatalog, "get_key", staticmethod(lambda student_id, subject_id: subject_id))
+    monkeypatch.setattr(SubjectCatalog, "match", staticmethod(lambda student_id, subject_id: subject_id))
+
+    @contextmanager
+    def write_session(student_ids):
+        yield None
+    monkeypatch.setattr(read_router, "write_session", write_session)
+    monkeypatch.setattr(log_buffer_module.event_bus, "notify_many", lambda *args, **kwargs: None)
+    return db
+
+@pytest.fixture
+def buffer(app):
+    buffer = LogBuffer()
+    buffer.init_app(app)
+    # Flushes are driven by the tests, not the background thread
+    buffer._ensure_started = lambda: None
+    return buffer
+
+def add_concurrently(buffer, student_ids):
+    """Add one entry per student from separate threads, flush once they
+    are all buffered, and return {studentId: add() result}."""
+    results = {}
+
+    def add(student_id):
+        results[student_id] = buffer.add(student_id, "math", DATE, 1, timeout=5)
+
+    threads = [threading.Thread(target=add, args=(student_id,)) for student_id in student_ids]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while len(buffer._batch.entries) < len(student_ids) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffer.flush()
+    for thread in threads:
+        thread.join()
+    return results
+
+def students_written(collection):
+    return sorted(op._filter["studentId"] for ops in collection.writes for op in ops)
+
+def test_timeout_before_flush_leaves_no_write(db, buffer):
+    assert buffer.add("s1", "math", DATE, 1, timeout=0.05) is False
+    assert buffer._batch.entries == {}
+
+    buffer.flush()
+    assert db.daily_logs.writes == []
+    assert db.weekly_totals.writes == []
+
+def test_timeout_only_takes_back_its_own_share(db, buffer):
+    buffer.durability = "accepted"
+    assert buffer.add("s1", "math", DATE, 2) is True
+    buffer.durability = "flushed"
+    assert buffer.add("s1", "math", DATE, 1, timeout=0.05) is False
+
+    assert buffer._batch.entries[("s1", "math", DATE)][:2] == [2.0, 1]
+
+def test_bulk_write_error_marks_exactly_the_failed_keys(db, buffer):
+    def fail(collection, ops):
+        failed = [index for index, op in enumerate(ops) if op._filter["studentId"] == "s2"]
+        collection.apply([op for op in ops if op._filter["studentId"] != "s2"])
+        raise BulkWriteError({"writeErrors": [{"index": index, "errmsg": "boom"} for index in failed]})
+    db.daily_logs.fail = fail
+
+    results = add_concurrently(buffer, ["s1", "s2", "s3"])
+
+    assert results == {"s1": True, "s2": False, "s3": True}
+    # Totals only follow the logs that were written
+    assert students_written(db.timetables) == ["s1", "s3"]
+    assert students_written(db.weekly_totals) == ["s1", "s3"]
+
+def test_ambiguous_error_is_resolved_through_last_flush(db, buffer):
+    def fail(collection, ops):
+        # Connection lost after the server applied some of the upserts
+        collection.apply([op for op in ops if op._filter["studentId"] != "s2"])
+        raise AutoReconnect("connection reset")
+    db.daily_logs.fail = fail
+
+    results = add_concurrently(buffer, ["s1", "s2", "s3"])
+
+    assert results == {"s1": True, "s2": False, "s3": True}
+    assert students_written(db.weekly_totals) == ["s1", "s3"]
+
+def test_unreadable_outcome_reports_every_key_failed(db, buffer):
+    def fail(collection, ops):
+        raise AutoReconnect("connection reset")
+    db.daily_logs.fail = fail
+    db.daily_logs.find = lambda *args, **kwargs: (_ for _ in ()).throw(AutoReconnect("still down"))
+
+    results = add_concurrently(buffer, ["s1", "s2"])
+
+    assert results == {"s1": False, "s2": False}
+    assert db.weekly_totals.writes == []
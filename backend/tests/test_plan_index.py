@@ -0,0 +1,96 @@
+import pytest
+from bson.objectid import ObjectId
+
+from app import create_app
+from app.models.records import TimetableSlot
+from app.models.timetable import Timetable
+from app.services import plan_resolver
+from app.services.plan_resolver import PlanResolver, _PlanIndex
+
+MONDAY = 0
+
+def slot(subject_id, planned_hours=1, day_of_week=MONDAY, start_date=None, end_date=None):
+    return TimetableSlot({
+        "_id": ObjectId(),
+        "subjectId": subject_id,
+        "dayOfWeek": day_of_week,
+        "plannedHours": planned_hours,
+        "startDate": start_date,
+        "endDate": end_date
+    })
+
+def planned_on(index, date_str, day_of_week=MONDAY):
+    return sorted((s.subject_id, s.planned_hours) for s in index.slots_on(date_str, day_of_week))
+
+def test_open_ended_slot_applies_on_every_date_of_its_day():
+    index = _PlanIndex([slot("math", start_date="", end_date=None)])
+    assert planned_on(index, "1999-01-04") == [("math", 1)]
+    assert planned_on(index, "2030-12-30") == [("math", 1)]
+    assert planned_on(index, "2024-01-02", day_of_week=1) == []
+
+def test_interval_bounds_are_inclusive():
+    index = _PlanIndex([slot("math", start_date="2024-01-08", end_date="2024-01-22")])
+    assert planned_on(index, "2024-01-01") == []
+    assert planned_on(index, "2024-01-08") == [("math", 1)]
+    assert planned_on(index, "2024-01-22") == [("math", 1)]
+    assert planned_on(index, "2024-01-29") == []
+
+def test_later_version_supersedes_earlier_one():
+    index = _PlanIndex([
+        slot("math", planned_hours=3, start_date="2024-02-05"),
+        slot("math", planned_hours=1)
+    ])
+    assert planned_on(index, "2024-01-29") == [("math", 1)]
+    assert planned_on(index, "2024-02-05") == [("math", 3)]
+    assert planned_on(index, "2024-06-03") == [("math", 3)]
+
+def test_gap_between_versions_plans_nothing():
+    index = _PlanIndex([
+        slot("math", planned_hours=1, end_date="2024-01-15"),
+        slot("math", planned_hours=2, start_date="2024-01-29")
+    ])
+    assert planned_on(index, "2024-01-15") == [("math", 1)]
+    assert planned_on(index, "2024-01-22") == []
+    assert planned_on(index, "2024-01-29") == [("math", 2)]
+
+def test_subjects_are_resolved_independently():
+    index = _PlanIndex([
+        slot("math", planned_hours=1),
+        slot("physics", planned_hours=2, start_date="2024-01-08"),
+        slot("math", planned_hours=4, start_date="2024-01-15")
+    ])
+    assert planned_on(index, "2024-01-01") == [("math", 1)]
+    assert planned_on(index, "2024-01-08") == [("math", 1), ("physics", 2)]
+    assert planned_on(index, "2024-01-15") == [("math", 4), ("physics", 2)]
+
+def test_total_planned_sums_over_days():
+    slots = [
+        slot("math", planned_hours=2, day_of_week=0),
+        slot("physics", planned_hours=1.5, day_of_week=2, end_date="2024-01-02")
+    ]
+    week = [("2024-01-01", 0), ("2024-01-02", 1), ("2024-01-03", 2)]
+    assert PlanResolver.total_planned(slots, week) == 2
+
+@pytest.fixture
+def app():
+    app = create_app()
+    plan_resolver._cache.clear()
+    with app.app_context():
+        yield app
+    plan_resolver._cache.clear()
+
+def test_cached_index_is_rebuilt_when_version_changes(app, monkeypatch):
+    version = [1]
+    reads = []
+    monkeypatch.setattr(Timetable, 'plan_version', staticmethod(lambda student_id, session=None: version[0]))
+    monkeypatch.setattr(Timetable, 'get_student_timetable',
+                        staticmethod(lambda student_id, session=None: reads.append(student_id) or [slot("math")]))
+
+    PlanResolver.slots_for_dates("s1", ["2024-01-01"])
+    PlanResolver.slots_for_dates("s1", ["2024-01-08"])
+    assert reads == ["s1"]
+
+    # e.g. a write handled by another worker process
+    version[0] = 2
+    PlanResolver.slots_for_dates("s1", ["2024-01-01"])
+    assert reads == ["s1", "s1"]
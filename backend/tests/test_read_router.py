@@ -0,0 +1,61 @@
+import base64
+
+import pytest
+from bson import json_util
+from bson.timestamp import Timestamp
+
+from app import create_app
+from app.extensions import mongo
+from app.services.read_router import read_router
+
+CLUSTER_TIME = {"clusterTime": Timestamp(1700000000, 1), "signature": {"hash": b"x" * 20, "keyId": 1}}
+TOKEN = {"students": ["s1"], "clusterTime": CLUSTER_TIME, "operationTime": Timestamp(1700000000, 1)}
+
+@pytest.fixture
+def app():
+    return create_app()
+
+def cookie_token(app, raw):
+    with app.test_request_context(headers={"Cookie": f"{read_router.COOKIE}={raw}"}):
+        return read_router._cookie_token()
+
+def test_signed_token_round_trips(app):
+    token = cookie_token(app, read_router.serializer.dumps(TOKEN))
+    assert token["students"] == ["s1"]
+    assert token["operationTime"] == TOKEN["operationTime"]
+
+def test_unsigned_token_is_ignored(app):
+    raw = base64.urlsafe_b64encode(json_util.dumps(TOKEN).encode()).decode()
+    assert cookie_token(app, raw) is None
+
+def test_token_signed_with_another_key_is_ignored(app):
+    other = create_app()
+    other.config['SECRET_KEY'] = 'another-key'
+    read_router.init_app(other)
+    raw = read_router.serializer.dumps(TOKEN)
+    read_router.init_app(app)
+    assert cookie_token(app, raw) is None
+
+def test_token_without_cluster_timestamp_is_ignored(app):
+    raw = read_router.serializer.dumps(dict(TOKEN, clusterTime={}))
+    assert cookie_token(app, raw) is None
+
+class _RejectingSession:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def advance_cluster_time(self, cluster_time):
+        raise ValueError("Invalid cluster_time")
+
+    def advance_operation_time(self, operation_time):
+        pass
+
+def test_read_session_falls_back_when_times_are_rejected(app, monkeypatch):
+    monkeypatch.setattr(mongo, 'cx', type('Client', (), {'start_session': lambda self, **kwargs: _RejectingSession()})())
+    raw = read_router.serializer.dumps(TOKEN)
+    with app.test_request_context(headers={"Cookie": f"{read_router.COOKIE}={raw}"}):
+        with read_router.read_session("s1") as session:
+            assert session is None
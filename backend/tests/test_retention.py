@@ -0,0 +1,18 @@
+import pytest
+
+from app.services.retention_service import RetentionService
+
+@pytest.mark.parametrize("student_id", ["s1", "65a1f0c2e4b0a1b2c3d4e5f6", "..x", "a.b-c"])
+def test_valid_archive_ids(student_id):
+    assert RetentionService.valid_archive_id(student_id)
+
+@pytest.mark.parametrize("student_id", ["", ".", "..", "../../x", "a/b", "a\\b", "a\0b", None])
+def test_path_like_archive_ids_are_rejected(student_id):
+    assert not RetentionService.valid_archive_id(student_id)
+
+def test_delete_archives_refuses_path_traversal(tmp_path):
+    outside = tmp_path / "x-1.ndjson.gz"
+    outside.write_bytes(b"")
+    with pytest.raises(ValueError):
+        RetentionService.delete_archives(f"../../{tmp_path}/x")
+    assert outside.exists()
@@ -0,0 +1,23 @@
+import base64
+from datetime import datetime
+
+import pytest
+
+from app.services.sync_service import SyncService
+
+def cursor(text):
+    return base64.urlsafe_b64encode(text.encode()).decode().rstrip('=')
+
+def test_cursor_round_trips():
+    moment = datetime(2024, 1, 2, 3, 4, 5, 678000)
+    assert SyncService.decode_cursor(SyncService.encode_cursor(moment)) == moment
+
+@pytest.mark.parametrize("token", [
+    cursor("99999999999999999999"),
+    cursor("-99999999999999999999"),
+    cursor("not a number"),
+    "%%%"
+])
+def test_malformed_cursors_raise_value_error(token):
+    with pytest.raises(ValueError):
+        SyncService.decode_cursor(token)
@@ -0,0 +1,59 @@
+"""Check read routing against a local 3-member replica set.
+
+    mkdir -p /tmp/rs0-0 /tmp/rs0-1 /tmp/rs0-2
+    mongod --replSet rs0 --port 27017 --dbpath /tmp/rs0-0 --fork --logpath /tmp/rs0-0.log
+    mongod --replSet rs0 --port 27018 --dbpath /tmp/rs0-1 --fork --logpath /tmp/rs0-1.log
+    mongod --replSet rs0 --port 27019 --dbpath /tmp/rs0-2 --fork --logpath /tmp/rs0-2.log
+    mongosh --eval 'rs.initiate({_id: "rs0", members: [
+        {_id: 0, host: "localhost:27017"},
+        {_id: 1, host: "localhost:27018"},
+        {_id: 2, host: "localhost:27019"}]})'
+
+    MONGO_URI="mongodb://localhost:27017,localhost:27018,localhost:27019/studytrack?replicaSet=rs0" \\
+        python verify_read_routing.py
+"""
+import uuid
+from datetime import datetime
+
+from app import create_app
+from app.extensions import mongo
+from app.models.log import DailyLog
+from app.services.read_router import read_metrics
+from app.services.stats_service import StatsService
+
+app = create_app()
+
+with app.app_context():
+    student_id = "test_routing_" + str(uuid.uuid4())
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    print(f"Testing with Student ID: {student_id}")
+    print(f"Primary: {mongo.cx.primary}, secondaries: {sorted(mongo.cx.secondaries)}")
+
+    # 1. Read-your-writes: each stats read right after a log must include it
+    failures = 0
+    for i in range(1, 51):
+        DailyLog.create(student_id, "Math", today_str, 1, "")
+        stats = StatsService.calculate_stats(student_id, 'daily', today_str)
+        if stats['totalHours'] != i:
+            failures += 1
+            print(f"FAIL: after {i} logs stats saw {stats['totalHours']} hours")
+
+    # 2. Split of analytics reads between members
+    print("Reads per member:")
+    for member, commands in sorted(read_metrics.snapshot().items()):
+        print(f"  {member}: {commands}")
+
+    secondaries = {f"{host}:{port}" for host, port in mongo.cx.secondaries}
+    served_by_secondary = sum(
+        sum(commands.values()) for member, commands in read_metrics.snapshot().items() if member in secondaries
+    )
+
+    # Cleanup
+    mongo.db.daily_logs.delete_many({"studentId": student_id})
+
+    if failures:
+        print(f"FAILURE: {failures} stale reads")
+    elif not served_by_secondary:
+        print("FAILURE: no reads were routed to a secondary")
+    else:
+        print(f"SUCCESS: read-your-writes held, {served_by_secondary} reads served by secondaries")
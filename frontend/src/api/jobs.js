@@ -0,0 +1,23 @@
+import api from './axios';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// Poll a background job (e.g. a reset, which answers 202 with a jobId)
+// until it finishes. Resolves with the job, rejects if it failed or is
+// still running after `timeoutMs`.
+export const waitForJob = async (jobId, { intervalMs = 1000, timeoutMs = 120000 } = {}) => {
+    const deadline = Date.now() + timeoutMs;
+    while (true) {
+        const { data: job } = await api.get(`/jobs/${jobId}`);
+        if (job.status === 'completed') {
+            return job;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'Job failed');
+        }
+        if (Date.now() >= deadline) {
+            throw new Error('Timed out waiting for job');
+        }
+        await sleep(intervalMs);
+    }
+};
@@ -2,6 +2,7 @@ import React, { useState, useEffect } from 'react';
 import DailyRoutine from '../components/DailyRoutine';
 import Timetable from './Timetable';
 import api from '../api/axios';
+import { waitForJob } from '../api/jobs';
 import { useAuth } from '../context/AuthContext';
 import { Bar } from 'react-chartjs-2';
 import {
@@ -29,6 +30,7 @@ const StudentDashboard = () => {
     const [weeklyStats, setWeeklyStats] = useState(null);
     const [dailyStats, setDailyStats] = useState(null);
     const [loading, setLoading] = useState(true);
+    const [statsVersion, setStatsVersion] = useState(0);
 
     // Log Form State
     const [logData, setLogData] = useState({
@@ -44,11 +46,12 @@ const StudentDashboard = () => {
         setLoading(true);
         setShowResetLogsModal(false);
         try {
-            await api.delete(`/logs/?studentId=${user.id}`);
+            // The reset runs as a background job; wait for it before refetching
+            const res = await api.delete(`/logs/?studentId=${user.id}`);
+            setLogStatus({ type: 'success', msg: 'Resetting logs...' });
+            await waitForJob(res.data.jobId);
             setLogStatus({ type: 'success', msg: 'All logs reset successfully.' });
-            // Refresh stats to show 0
-            setDailyStats(null);
-            setWeeklyStats(null);
+            setStatsVersion((version) => version + 1);
         } catch (err) {
             console.error("Failed to reset logs", err);
             setLogStatus({ type: 'error', msg: 'Failed to reset logs.' });
@@ -77,7 +80,7 @@ const StudentDashboard = () => {
             }
         };
         fetchStats();
-    }, [user.id, activeTab, selectedDate, selectedWeeklyDate]); // Refresh when any dependency changes
+    }, [user.id, activeTab, selectedDate, selectedWeeklyDate, statsVersion]); // Refresh when any dependency changes
 
     const handleLogSubmit = async (e) => {
         e.preventDefault();
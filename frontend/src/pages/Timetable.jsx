@@ -1,5 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import api from '../api/axios';
+import { waitForJob } from '../api/jobs';
 import { useAuth } from '../context/AuthContext';
 import { useNavigate } from 'react-router-dom';
 
@@ -86,7 +87,9 @@ const Timetable = () => {
         setLoading(true);
         setShowResetModal(false);
         try {
-            await api.delete(`/timetable/?studentId=${user.id}`);
+            // The reset runs as a background job; wait for it before refetching
+            const res = await api.delete(`/timetable/?studentId=${user.id}`);
+            await waitForJob(res.data.jobId);
             setSuccess('Timetable plan reset successfully.');
             setTimeout(() => setSuccess(''), 3000);
             fetchTimetable();